@@ -0,0 +1,26 @@
+# Database routing: ingestion writes go to the "ingest" alias, everything else to "default".
+# Both aliases point at the same database (see DATABASES in settings.py), so relations
+# between them are allowed and migrations only run once, on "default".
+
+INGEST_APPS = {'data_ingestion'}
+
+
+class IngestionRouter:
+
+    def db_for_read(self, model, **hints):
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        if model.__module__ == '__fake__':
+            # Historical models in data migrations: no opinion, so Django keeps the write on
+            # the instance's database or "default", the connection running the migration
+            return None
+        if model._meta.app_label in INGEST_APPS:
+            return 'ingest'
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
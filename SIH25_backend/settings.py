@@ -84,12 +84,65 @@ WSGI_APPLICATION = 'SIH25_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# DB_ENGINE selects the backend: "sqlite" (default) or "postgresql" (configured by the DB_* variables).
+# Two aliases share the same database: "default" serves the API's reads and "ingest" is used by
+# ingestion writes (see SIH25_backend/db_routers.py), so a long ingestion transaction runs on its
+# own connection.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+# Seconds a connection is kept open between requests (0 closes it after every request)
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+if DB_ENGINE == 'postgresql':
+    _primary = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DB_NAME', 'argo'),
+        'USER': os.environ.get('DB_USER', 'argo'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    }
+    DATABASES = {
+        'default': _primary,
+        'ingest': {**_primary, 'TEST': {'MIRROR': 'default'}},
+    }
+else:
+    # WAL lets readers keep going while ingestion writes; synchronous=NORMAL is safe under WAL.
+    # 'timeout' waits for a busy database instead of failing at once, and IMMEDIATE write
+    # transactions take the write lock up front instead of failing on upgrade.
+    _sqlite_pragmas = (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA temp_store=MEMORY;'
+        f"PRAGMA cache_size=-{int(os.environ.get('SQLITE_CACHE_KB', 65536))};"
+        f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_BYTES', 268435456))};"
+    )
+    _sqlite = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', str(BASE_DIR / 'db.sqlite3')),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': _sqlite_pragmas,
+            'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 30)),
+        },
     }
-}
+    DATABASES = {
+        'default': _sqlite,
+        'ingest': {
+            **_sqlite,
+            'OPTIONS': {**_sqlite['OPTIONS'], 'transaction_mode': 'IMMEDIATE'},
+            'TEST': {'MIRROR': 'default'},
+        },
+    }
+
+DATABASE_ROUTERS = ['SIH25_backend.db_routers.IngestionRouter']
+
+# Tests run "ingest" on the "default" connection (see SIH25_backend/test_runner.py)
+TEST_RUNNER = 'SIH25_backend.test_runner.SharedIngestConnectionRunner'
 
 
 # Password validation
@@ -132,3 +185,104 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# ARGO ingestion
+# Concurrent downloaders used by URL ingestion, and how many downloaded files may wait for the parser
+
+ARGO_DOWNLOAD_CONCURRENCY = int(os.environ.get('ARGO_DOWNLOAD_CONCURRENCY', 8))
+
+ARGO_DOWNLOAD_QUEUE_SIZE = int(os.environ.get('ARGO_DOWNLOAD_QUEUE_SIZE', 16))
+
+# Directory crawling: concurrent listings, plus a persistent listing cache revalidated with ETag/Last-Modified.
+# Set ARGO_LISTING_CACHE_PATH to an empty string to disable the cache; listings younger than
+# ARGO_LISTING_CACHE_MAX_AGE seconds are reused without any request.
+
+ARGO_CRAWL_CONCURRENCY = int(os.environ.get('ARGO_CRAWL_CONCURRENCY', 8))
+
+ARGO_LISTING_CACHE_PATH = os.environ.get('ARGO_LISTING_CACHE_PATH', str(BASE_DIR / 'argo_listing_cache.json'))
+
+ARGO_LISTING_CACHE_MAX_AGE = int(os.environ.get('ARGO_LISTING_CACHE_MAX_AGE', 0))
+
+# Number of new profiles (with their level rows) bulk-inserted per transaction
+
+ARGO_PROFILE_BATCH_SIZE = int(os.environ.get('ARGO_PROFILE_BATCH_SIZE', 500))
+
+# Processes used to decode NetCDF files during ingestion (0 or 1 decodes in the writer process).
+# Decoded arrays are returned to a single DB writer.
+
+ARGO_DECODE_WORKERS = int(os.environ.get('ARGO_DECODE_WORKERS', 0))
+
+# Profiles decoded and saved at a time when processing a file, which bounds peak memory for large uploads
+
+ARGO_PROFILE_SLICE_SIZE = int(os.environ.get('ARGO_PROFILE_SLICE_SIZE', 500))
+
+# Ocean classification: 0 computes the exact nearest region per point; a resolution in degrees
+# (e.g. 0.25) answers from a precomputed lookup grid instead
+
+ARGO_OCEAN_GRID_RESOLUTION = float(os.environ.get('ARGO_OCEAN_GRID_RESOLUTION', 0))
+
+# How measurement rows are written: "raw" loads row tuples directly (COPY on PostgreSQL,
+# executemany elsewhere); "orm" builds ArgoMeasurement objects for bulk_create
+
+ARGO_MEASUREMENT_LOADER = os.environ.get('ARGO_MEASUREMENT_LOADER', 'raw')
+
+# Level storage: "rows" (one ArgoMeasurement per level), "packed" (one ArgoProfileLevels row of
+# packed float32 vectors per profile) or "both"
+
+ARGO_LEVEL_STORAGE = os.environ.get('ARGO_LEVEL_STORAGE', 'rows')
+
+# Parquet archive written by the export_argo_parquet command (partitioned by ocean_name/year)
+# and read by the lookup endpoint with source=parquet. Requires pyarrow.
+
+ARGO_PARQUET_ROOT = os.environ.get('ARGO_PARQUET_ROOT', str(BASE_DIR / 'argo_parquet'))
+
+# Standard pressure grid (dbar, comma-separated) that temperature and salinity are interpolated
+# onto at ingestion (ArgoStandardLevel)
+
+ARGO_STANDARD_PRESSURES = [
+    float(p) for p in os.environ.get(
+        'ARGO_STANDARD_PRESSURES',
+        '5,10,20,30,50,75,100,125,150,200,250,300,400,500,600,700,800,900,1000,1100,1200,1300,1400,1500,1750,2000',
+    ).split(',')
+]
+
+# Lookup endpoint paging: default and maximum rows per page (stream=1 returns every row)
+
+ARGO_LOOKUP_PAGE_SIZE = int(os.environ.get('ARGO_LOOKUP_PAGE_SIZE', 1000))
+
+ARGO_LOOKUP_MAX_PAGE_SIZE = int(os.environ.get('ARGO_LOOKUP_MAX_PAGE_SIZE', 10000))
+
+# Most profiles one profile-levels request may ask for
+
+ARGO_LEVELS_MAX_PROFILES = int(os.environ.get('ARGO_LEVELS_MAX_PROFILES', 1000))
+
+# Grid endpoint cell size in degrees: default and smallest allowed
+
+ARGO_GRID_DEFAULT_RESOLUTION = float(os.environ.get('ARGO_GRID_DEFAULT_RESOLUTION', 5.0))
+
+ARGO_GRID_MIN_RESOLUTION = float(os.environ.get('ARGO_GRID_MIN_RESOLUTION', 0.25))
+
+# Lookup response cache: entries kept in each process (0 disables it) and, when
+# ARGO_LOOKUP_CACHE_DIR is set, a file cache shared by all workers. Entries are keyed by
+# the data generation that ingestion bumps, so the timeout only bounds disk usage.
+
+ARGO_LOOKUP_CACHE_SIZE = int(os.environ.get('ARGO_LOOKUP_CACHE_SIZE', 256))
+
+ARGO_LOOKUP_CACHE_TIMEOUT = int(os.environ.get('ARGO_LOOKUP_CACHE_TIMEOUT', 3600))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+if os.environ.get('ARGO_LOOKUP_CACHE_DIR'):
+    CACHES['argo_lookup'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['ARGO_LOOKUP_CACHE_DIR'],
+        'TIMEOUT': ARGO_LOOKUP_CACHE_TIMEOUT,
+    }
+    ARGO_LOOKUP_CACHE_ALIAS = 'argo_lookup'
+else:
+    ARGO_LOOKUP_CACHE_ALIAS = ''
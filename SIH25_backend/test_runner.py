@@ -0,0 +1,19 @@
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+
+class SharedIngestConnectionRunner(DiscoverRunner):
+    """
+    Test runner that makes the "ingest" alias reuse the "default" connection.
+
+    A TEST MIRROR alias is still a second connection to the test database. TestCase only
+    wraps "default" in its transaction, so ingestion writes through "ingest" would wait on
+    that transaction's lock (SQLite) or bypass its rollback (PostgreSQL).
+    """
+
+    def setup_databases(self, **kwargs):
+        old_config = super().setup_databases(**kwargs)
+        if "ingest" in connections and "default" in connections:
+            connections["ingest"].close()
+            connections["ingest"] = connections["default"]
+        return old_config
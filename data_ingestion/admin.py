@@ -1,6 +1,11 @@
 from django.contrib import admin
-from .models import ArgoProfileData, ArgoMeasurement
+from .models import ArgoProfileData, ArgoMeasurement, ArgoSourceFile, IngestionJob, ArgoProfileLevels, ArgoProfileSummary, ArgoStandardLevel, DataGeneration
 # Register your models here.
 admin.site.register(ArgoProfileData)
 admin.site.register(ArgoMeasurement)
-
+admin.site.register(ArgoSourceFile)
+admin.site.register(IngestionJob)
+admin.site.register(ArgoProfileLevels)
+admin.site.register(ArgoProfileSummary)
+admin.site.register(ArgoStandardLevel)
+admin.site.register(DataGeneration)
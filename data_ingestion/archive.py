@@ -0,0 +1,302 @@
+import os
+import json
+import shutil
+import logging
+from urllib.parse import unquote
+from datetime import datetime, timezone
+from django.conf import settings
+from .models import ArgoProfileData, ArgoProfileLevels, DataGeneration
+from .services import haversine_distance, longitude_ranges, radius_bounds, read_level_columns
+
+logger = logging.getLogger(__name__)
+
+# --- PARQUET ARCHIVE ---
+# A denormalised copy of the ARGO tables for analytical scans: one row per level with its
+# profile's header columns, stored as a Parquet dataset partitioned by ocean_name/year
+# (hive layout). pyarrow is optional; only the functions below need it.
+
+# Export watermark kept next to the data: profiles with pk <= last_profile_id are exported,
+# as they were at DataGeneration PROFILE_EDITS value profile_edits
+STATE_FILE = "_export_state.json"
+
+
+class ArchiveUnavailable(Exception):
+    """Raised when the Parquet archive cannot be used (pyarrow missing or nothing exported)."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as pa_ds
+    except ImportError as e:
+        raise ArchiveUnavailable("pyarrow is required for the Parquet archive (pip install pyarrow)") from e
+    return pa, pa_ds
+
+def archive_root(root=None):
+    return str(root or getattr(settings, "ARGO_PARQUET_ROOT", os.path.join(settings.BASE_DIR, "argo_parquet")))
+
+def _schema(pa):
+    fields = [
+        ("profile_id", pa.int64()),
+        ("platform_number", pa.string()),
+        ("cycle_number", pa.int32()),
+        ("juld_date", pa.timestamp("us", tz="UTC")),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("data_mode", pa.string()),
+    ]
+    fields += [(f, pa.float32()) for f in ArgoProfileLevels.FLOAT_FIELDS]
+    fields += [(f, pa.string()) for f in ArgoProfileLevels.QC_FIELDS]
+    fields += [("ocean_name", pa.string()), ("year", pa.int32())]
+    return pa.schema(fields)
+
+def _partitioning(pa, pa_ds):
+    return pa_ds.partitioning(pa.schema([("ocean_name", pa.string()), ("year", pa.int32())]), flavor="hive")
+
+def read_export_state(root=None):
+    path = os.path.join(archive_root(root), STATE_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"last_profile_id": 0, "profiles": 0, "rows": 0}
+
+def archive_is_stale(root=None):
+    """
+    True when profiles already in the archive were replaced, reclassified or deleted since
+    it was exported; appending new profiles cannot fix that, only a full rebuild.
+    """
+    state = read_export_state(root)
+    return bool(state["profiles"]) and state.get("profile_edits", 0) != DataGeneration.current(DataGeneration.PROFILE_EDITS)
+
+def _write_export_state(root, state):
+    path = os.path.join(root, STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+# --- EXPORT ---
+
+def _export_table(pa, profiles):
+    """Builds the denormalised level table for one batch of profile value dicts."""
+    by_id = {p["pk"]: p for p in profiles}
+    level_ids, levels = read_level_columns(list(by_id))
+    headers = [by_id[pid] for pid in level_ids.tolist()]
+
+    columns = {
+        "profile_id": level_ids,
+        "platform_number": [h["platform_number"] for h in headers],
+        "cycle_number": [h["cycle_number"] for h in headers],
+        "juld_date": [h["juld_date"] for h in headers],
+        "latitude": [h["latitude"] for h in headers],
+        "longitude": [h["longitude"] for h in headers],
+        "data_mode": [h["data_mode"] for h in headers],
+    }
+    for f in ArgoProfileLevels.FLOAT_FIELDS:
+        # NaN marks missing values and becomes a Parquet null
+        columns[f] = pa.array(levels[f], type=pa.float32(), from_pandas=True)
+    for f in ArgoProfileLevels.QC_FIELDS:
+        columns[f] = list(levels[f])
+    columns["ocean_name"] = [h["ocean_name"] for h in headers]
+    columns["year"] = [h["juld_date"].year if h["juld_date"] else None for h in headers]
+    return pa.table(columns, schema=_schema(pa))
+
+def export_archive(root=None, batch_size=5000, full=False, on_batch=None):
+    """
+    Appends profiles added since the last export to the Parquet archive, batch_size profiles
+    per written file set. The watermark is saved after every batch, so an interrupted export
+    resumes where it stopped. full=True rebuilds the archive from scratch, which is also done
+    when already exported profiles were edited or deleted since (see archive_is_stale).
+    Returns: the updated export state dict
+    """
+    pa, pa_ds = _pyarrow()
+    root = archive_root(root)
+    if not full and archive_is_stale(root):
+        logger.warning(f"⚠️ Exported profiles were replaced, reclassified or deleted since the last export. Rebuilding {root}.")
+        full = True
+    # Read before exporting: edits made while the export runs trigger the next rebuild
+    profile_edits = DataGeneration.current(DataGeneration.PROFILE_EDITS)
+    if full and os.path.isdir(root):
+        shutil.rmtree(root)
+    os.makedirs(root, exist_ok=True)
+
+    state = read_export_state(root)
+    while True:
+        # Keyset pagination over the primary key, like reclassify_oceans
+        profiles = list(
+            ArgoProfileData.objects.filter(pk__gt=state["last_profile_id"]).order_by("pk")
+            .values("pk", "platform_number", "cycle_number", "juld_date", "latitude", "longitude", "data_mode", "ocean_name")[:batch_size]
+        )
+        if not profiles:
+            break
+
+        table = _export_table(pa, profiles)
+        if table.num_rows:
+            pa_ds.write_dataset(
+                table,
+                root,
+                format="parquet",
+                partitioning=_partitioning(pa, pa_ds),
+                basename_template=f"part-{profiles[0]['pk']}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+
+        state = {
+            "last_profile_id": profiles[-1]["pk"],
+            "profiles": state["profiles"] + len(profiles),
+            "rows": state["rows"] + table.num_rows,
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "profile_edits": profile_edits,
+        }
+        _write_export_state(root, state)
+        if on_batch:
+            on_batch(state)
+
+    return state
+
+
+# --- READ API ---
+
+def _as_utc(value):
+    """Treats naive datetimes as UTC (the project's TIME_ZONE) for timestamp comparisons."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _longitude_condition(field, min_lon, max_lon):
+    """Longitude interval as an expression; min_lon > max_lon crosses the dateline."""
+    condition = None
+    for lo, hi in longitude_ranges(min_lon, max_lon):
+        part = (field("longitude") >= lo) & (field("longitude") <= hi)
+        condition = part if condition is None else condition | part
+    return condition
+
+def archive_filter(min_lat=None, max_lat=None, min_lon=None, max_lon=None,
+                   start_date=None, end_date=None, min_pres=None, max_pres=None,
+                   ocean_name=None, platform_number=None, radius=None):
+    """
+    Builds a pyarrow dataset filter expression from optional bounds (inclusive). Bounds on
+    lat/lon/date/pressure are checked against Parquet row-group statistics; ocean_name and
+    the years covered by the date range prune whole partitions. radius=(lat, lon, km) adds
+    the circle's bounding box; read_archive() applies the exact distance afterwards.
+    Returns: expression, or None when no bound is given
+    """
+    pa, pa_ds = _pyarrow()
+    field = pa_ds.field
+    conditions = []
+
+    for name, low, high in (
+        ("latitude", min_lat, max_lat),
+        ("pressure", min_pres, max_pres),
+    ):
+        if low is not None:
+            conditions.append(field(name) >= low)
+        if high is not None:
+            conditions.append(field(name) <= high)
+    if min_lon is not None or max_lon is not None:
+        conditions.append(_longitude_condition(field, min_lon, max_lon))
+
+    if radius is not None:
+        box_min_lat, box_max_lat, box_min_lon, box_max_lon = radius_bounds(*radius)
+        conditions.append((field("latitude") >= box_min_lat) & (field("latitude") <= box_max_lat))
+        if box_min_lon is not None:
+            conditions.append(_longitude_condition(field, box_min_lon, box_max_lon))
+
+    timestamp = pa.timestamp("us", tz="UTC")
+    if start_date is not None:
+        conditions.append(field("juld_date") >= pa.scalar(_as_utc(start_date), type=timestamp))
+        conditions.append(field("year") >= start_date.year)
+    if end_date is not None:
+        conditions.append(field("juld_date") <= pa.scalar(_as_utc(end_date), type=timestamp))
+        conditions.append(field("year") <= end_date.year)
+
+    if ocean_name:
+        conditions.append(field("ocean_name") == ocean_name)
+    if platform_number:
+        conditions.append(field("platform_number") == str(platform_number))
+
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+def open_archive(root=None):
+    """Opens the exported Parquet archive as a pyarrow dataset."""
+    pa, pa_ds = _pyarrow()
+    root = archive_root(root)
+    if not os.path.isdir(root) or not read_export_state(root)["profiles"]:
+        raise ArchiveUnavailable(f"No Parquet archive at {root}; run the export_argo_parquet command first")
+    return pa_ds.dataset(root, format="parquet", partitioning=_partitioning(pa, pa_ds), exclude_invalid_files=True)
+
+def _partition_ocean_name(root, ocean_name):
+    """Matches ocean_name case-insensitively (like ocean_name__iexact) to a partition value."""
+    for entry in os.listdir(root):
+        if entry.startswith("ocean_name="):
+            value = unquote(entry.split("=", 1)[1])
+            if value.lower() == ocean_name.lower():
+                return value
+    return ocean_name
+
+def read_archive(columns=None, root=None, **bounds):
+    """
+    Scans the archive with the bounds of archive_filter() pushed down to the Parquet reader.
+    Returns: pyarrow.Table with the requested columns (all columns by default)
+    """
+    dataset = open_archive(root)
+    if bounds.get("ocean_name"):
+        bounds["ocean_name"] = _partition_ocean_name(archive_root(root), bounds["ocean_name"])
+    radius = bounds.get("radius")
+    if radius is None:
+        return dataset.to_table(columns=columns, filter=archive_filter(**bounds))
+
+    # Exact great-circle distance on the rows that passed the bounding box
+    columns = columns or dataset.schema.names
+    scan_columns = list(dict.fromkeys(columns + ["latitude", "longitude"]))
+    table = dataset.to_table(columns=scan_columns, filter=archive_filter(**bounds))
+    lat, lon, radius_km = radius
+    distance = haversine_distance(
+        lat, lon,
+        table.column("latitude").to_numpy(zero_copy_only=False),
+        table.column("longitude").to_numpy(zero_copy_only=False),
+    )
+    return table.filter(distance <= radius_km).select(columns)
+
+def profile_means(root=None, qc=None, **bounds):
+    """
+    Per-profile temperature/salinity/pressure means over the matching levels, computed
+    column-wise in Arrow. With qc (accepted flags), levels need pres_qc in qc and each
+    variable's mean only uses values whose own flag is in qc, as in level_means().
+    Rows have the same keys as the lookup endpoint's summary query.
+    """
+    group_keys = ["platform_number", "cycle_number", "juld_date", "latitude", "longitude", "ocean_name"]
+    columns = group_keys + ["temperature", "salinity", "pressure"]
+    if qc is not None:
+        columns += ArgoProfileLevels.QC_FIELDS
+    table = read_archive(columns=columns, root=root, **bounds)
+    if qc is not None:
+        pa, _ = _pyarrow()
+        import pyarrow.compute as pc
+
+        accepted = pa.array(list(qc), type=pa.string())
+        table = table.filter(pc.is_in(table.column("pres_qc"), value_set=accepted))
+        for field, qc_field in (("temperature", "temp_qc"), ("salinity", "psal_qc")):
+            good = pc.fill_null(pc.is_in(table.column(qc_field), value_set=accepted), False)
+            table = table.set_column(
+                table.schema.get_field_index(field), field,
+                pc.if_else(good, table.column(field), None),
+            )
+    means = table.group_by(group_keys).aggregate(
+        [("temperature", "mean"), ("salinity", "mean"), ("pressure", "mean")]
+    ).sort_by([("platform_number", "ascending"), ("cycle_number", "ascending")])
+
+    return [
+        {
+            **{key: row[key] for key in group_keys},
+            "avg_temp": row["temperature_mean"],
+            "avg_sal": row["salinity_mean"],
+            "avg_pres": row["pressure_mean"],
+        }
+        for row in means.to_pylist()
+    ]
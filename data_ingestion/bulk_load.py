@@ -0,0 +1,92 @@
+import io
+import time
+import logging
+from itertools import islice
+from django.db import connections, router
+
+logger = logging.getLogger(__name__)
+
+# Rows sent to the database per executemany call / COPY buffer
+CHUNK_SIZE = 5000
+
+
+# --- RAW BULK LOADER ---
+# Writes plain row tuples straight into a model's table, skipping model instantiation.
+# Callers are responsible for values already being in their database form (None for NULL).
+
+def load_rows(model, fields, rows, using=None):
+    """
+    Inserts rows (tuples ordered like fields) into model's table: COPY FROM STDIN on
+    PostgreSQL, executemany of a single INSERT everywhere else. Runs on the caller's
+    connection, so it joins any open transaction.
+    Returns: number of rows written
+    """
+    alias = using or router.db_for_write(model)
+    connection = connections[alias]
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = [connection.ops.quote_name(model._meta.get_field(f).column) for f in fields]
+
+    started = time.monotonic()
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            written = _copy_rows(cursor, table, columns, rows)
+        else:
+            written = _executemany_rows(cursor, table, columns, rows)
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"💾 Loaded {written} rows into {model._meta.db_table} in {elapsed:.2f}s "
+        f"({written / max(elapsed, 1e-9):.0f} rows/s)"
+    )
+    return written
+
+def _chunks(rows, size=CHUNK_SIZE):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _executemany_rows(cursor, table, columns, rows):
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    written = 0
+    for chunk in _chunks(rows):
+        cursor.executemany(sql, chunk)
+        written += len(chunk)
+    return written
+
+def _copy_rows(cursor, table, columns, rows):
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    written = 0
+    if is_psycopg3:
+        with cursor.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
+                written += 1
+        return written
+
+    # psycopg2: stream the rows in COPY text format, one buffer per chunk
+    for chunk in _chunks(rows):
+        buffer = io.StringIO()
+        for row in chunk:
+            buffer.write("\t".join(_copy_text(value) for value in row))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+        written += len(chunk)
+    return written
+
+def _copy_text(value):
+    """Formats one value for COPY text format (\\N is NULL)."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from data_ingestion.models import ArgoProfileData, ArgoProfileSummary, DataGeneration
+from data_ingestion.services import read_level_columns, summarize_profile_levels
+
+class Command(BaseCommand):
+    help = 'Compute ArgoProfileSummary rows for stored profiles that do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Profiles summarized per batch')
+        parser.add_argument('--rebuild', action='store_true', help='Delete all summaries and recompute them')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            ArgoProfileSummary.objects.all().delete()
+            DataGeneration.bump()
+
+        batch_size = options['batch_size']
+        last_pk, scanned, written = 0, 0, 0
+        while True:
+            # Keyset pagination over the primary key, only profiles still missing a summary
+            pks = list(
+                ArgoProfileData.objects.filter(pk__gt=last_pk, summary__isnull=True)
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            profile_ids, columns = read_level_columns(pks)
+            with transaction.atomic(using=router.db_for_write(ArgoProfileSummary)):
+                written += len(ArgoProfileSummary.objects.bulk_create(
+                    summarize_profile_levels(profile_ids, columns), batch_size=500
+                ))
+                DataGeneration.bump()
+
+            scanned += len(pks)
+            last_pk = pks[-1]
+            self.stdout.write(f'Scanned {scanned} profiles, {written} summaries written')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Wrote {written} profile summaries ({scanned} profiles scanned)'))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from data_ingestion.models import ArgoProfileData, ArgoStandardLevel, DataGeneration
+from data_ingestion.services import read_level_columns, standard_pressures, write_standard_levels
+
+class Command(BaseCommand):
+    help = 'Interpolate stored profiles without standard levels onto the ARGO_STANDARD_PRESSURES grid'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Profiles interpolated per batch')
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Delete all standard levels and recompute them (e.g. after changing the grid)')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            # Cached grid responses read standard levels; the bump invalidates them
+            with transaction.atomic(using=router.db_for_write(ArgoStandardLevel)):
+                ArgoStandardLevel.objects.all().delete()
+                DataGeneration.bump()
+
+        self.stdout.write(f'Standard grid: {", ".join(f"{p:g}" for p in standard_pressures())} dbar')
+        batch_size = options['batch_size']
+        last_pk, scanned, written = 0, 0, 0
+        while True:
+            # Keyset pagination over the primary key, only profiles without standard levels
+            pks = list(
+                ArgoProfileData.objects.filter(pk__gt=last_pk, standard_levels__isnull=True)
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            profile_ids, columns = read_level_columns(pks)
+            with transaction.atomic(using=router.db_for_write(ArgoStandardLevel)):
+                written += write_standard_levels(profile_ids, columns)
+                DataGeneration.bump()
+
+            scanned += len(pks)
+            last_pk = pks[-1]
+            self.stdout.write(f'Scanned {scanned} profiles, {written} standard levels written')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Wrote {written} standard levels ({scanned} profiles scanned)'))
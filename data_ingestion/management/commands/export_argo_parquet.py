@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from data_ingestion.archive import ArchiveUnavailable, archive_is_stale, archive_root, export_archive, read_export_state
+
+class Command(BaseCommand):
+    help = 'Export new Argo profiles and their levels to the Parquet archive (partitioned by ocean_name/year)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', default=None, help='Archive directory (defaults to ARGO_PARQUET_ROOT)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Profiles exported per batch')
+        parser.add_argument('--full', action='store_true', help='Delete the archive and export everything again')
+
+    def handle(self, *args, **options):
+        root = archive_root(options['root'])
+        started = time.monotonic()
+        full = options['full']
+        if not full and archive_is_stale(root):
+            self.stdout.write(self.style.WARNING('Exported profiles were edited or deleted since the last export; rebuilding the archive'))
+            full = True
+        before = 0 if full else read_export_state(root)['rows']
+
+        def report(state):
+            self.stdout.write(f"Exported {state['profiles']} profiles ({state['rows']} rows) up to id {state['last_profile_id']}")
+
+        try:
+            state = export_archive(root=root, batch_size=options['batch_size'], full=full, on_batch=report)
+        except ArchiveUnavailable as e:
+            raise CommandError(str(e))
+
+        added = state['rows'] - before
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Added {added} rows to {root} in {elapsed:.1f}s ({added / max(elapsed, 1e-9):.0f} rows/s)'
+        ))
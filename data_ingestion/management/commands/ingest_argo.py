@@ -0,0 +1,51 @@
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from data_ingestion.services import coordinate_argo_ingestion, ingest_file_contents
+
+class Command(BaseCommand):
+    help = 'Ingest ARGO NetCDF data from a URL (file or directory crawl) or from local .nc files/directories'
+
+    def add_arguments(self, parser):
+        parser.add_argument('sources', nargs='+', help='ARGO URL(s), local .nc files or directories of .nc files')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Decode processes (defaults to ARGO_DECODE_WORKERS; 0 or 1 decodes in-process)')
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Concurrent downloads for URL sources (defaults to ARGO_DOWNLOAD_CONCURRENCY)')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Profiles inserted per transaction (defaults to ARGO_PROFILE_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        total_saved = 0
+
+        for source in options['sources']:
+            if source.startswith(('http://', 'https://')):
+                total_saved += coordinate_argo_ingestion(
+                    source, concurrency=options['concurrency'], workers=options['workers'],
+                    batch_size=options['batch_size'],
+                )
+            elif os.path.exists(source):
+                total_saved += ingest_file_contents(
+                    self._local_files(source), workers=options['workers'], batch_size=options['batch_size']
+                )
+            else:
+                raise CommandError(f'Source not found: {source}')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Saved {total_saved} measurements in {elapsed:.1f}s ({total_saved / max(elapsed, 1e-9):.0f} rows/s)'
+        ))
+
+    def _local_files(self, path):
+        """Yields (file_source, file_path) for a .nc file or every .nc file under a directory; files are opened lazily by path."""
+        if os.path.isdir(path):
+            paths = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(path)
+                for name in names if name.endswith('.nc')
+            )
+        else:
+            paths = [path]
+        for file_path in paths:
+            yield file_path, file_path
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.models.functions import Lower
+from data_ingestion.models import (
+    ArgoProfileData, ArgoMeasurement, ArgoProfileLevels, ArgoProfileSummary, ArgoSourceFile, ArgoStandardLevel,
+    DataGeneration,
+)
+
+# Tables holding a profile's data, children first
+LEVEL_MODELS = [ArgoMeasurement, ArgoProfileLevels, ArgoProfileSummary, ArgoStandardLevel]
+
+class Command(BaseCommand):
+    help = 'Delete Argo data with set-based SQL: everything (--all) or the profiles matching the filters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Truncate all profile, level, summary, standard-level and source-manifest tables')
+        parser.add_argument('--platform', action='append', default=[], help='Float WMO number (repeatable)')
+        parser.add_argument('--start-date', help='Only profiles on or after this date (YYYY-MM-DD, UTC)')
+        parser.add_argument('--end-date', help='Only profiles on or before this date (YYYY-MM-DD, UTC)')
+        parser.add_argument('--ocean', help='Only profiles in this ocean (case-insensitive)')
+        parser.add_argument('--data-mode', action='append', default=[], choices=['R', 'A', 'D'],
+                            help='Only profiles with this data mode (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Profiles deleted per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many profiles match')
+
+    def handle(self, *args, **options):
+        profiles = self._matching_profiles(options)
+        if options['all']:
+            if profiles is not None:
+                raise CommandError('--all cannot be combined with filters')
+            return self._truncate(options['dry_run'])
+        if profiles is None:
+            raise CommandError('Give --all or at least one filter (--platform, --start-date, --end-date, --ocean, --data-mode)')
+
+        if options['dry_run']:
+            self.stdout.write(f'{profiles.count()} profiles match')
+            return
+
+        alias = router.db_for_write(ArgoProfileData)
+        batch_size = max(1, options['batch_size'])
+        last_pk, purged_profiles, purged_levels = 0, 0, 0
+        while True:
+            # Keyset pagination over the primary key keeps every batch an index range scan
+            pks = list(profiles.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic(using=alias):
+                counts = [self._delete_rows(alias, model, 'profile_id', pks) for model in LEVEL_MODELS]
+                purged_profiles += self._delete_rows(alias, ArgoProfileData, 'id', pks)
+                DataGeneration.bump()
+                DataGeneration.bump(DataGeneration.PROFILE_EDITS)
+            purged_levels += counts[0]
+            last_pk = pks[-1]
+            self.stdout.write(f'Purged {purged_profiles} profiles ({purged_levels} measurements)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Purged {purged_profiles} profiles and {purged_levels} measurements '
+            f'(source manifest kept: unchanged files are still skipped on re-sync)'
+        ))
+
+    def _matching_profiles(self, options):
+        """The ArgoProfileData queryset selected by the filters, or None when no filter is given."""
+        filters = {}
+        if options['platform']:
+            filters['platform_number__in'] = options['platform']
+        if options['start_date']:
+            filters['juld_date__gte'] = self._parse_date(options['start_date'], '--start-date')
+        if options['end_date']:
+            # Inclusive end date: everything before the following midnight
+            filters['juld_date__lt'] = self._parse_date(options['end_date'], '--end-date') + timedelta(days=1)
+        if options['ocean']:
+            filters['ocean_key'] = options['ocean'].lower()
+        if options['data_mode']:
+            filters['data_mode__in'] = options['data_mode']
+        if not filters:
+            return None
+        # LOWER(ocean_name) = ... like the lookup endpoint, so the (LOWER(ocean_name), juld_date)
+        # index serves it; ocean_name__iexact would compile to a LIKE that cannot use it
+        return ArgoProfileData.objects.alias(ocean_key=Lower('ocean_name')).filter(**filters)
+
+    @staticmethod
+    def _parse_date(value, option):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        except ValueError:
+            raise CommandError(f'Invalid {option} format, expected YYYY-MM-DD')
+
+    @staticmethod
+    def _delete_rows(alias, model, field, pks):
+        """One DELETE ... WHERE field IN (...) statement; no Python-side cascade collection."""
+        connection = connections[alias]
+        sql = 'DELETE FROM {} WHERE {} IN ({})'.format(
+            connection.ops.quote_name(model._meta.db_table),
+            connection.ops.quote_name(model._meta.get_field(field).column),
+            ', '.join(['%s'] * len(pks)),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, pks)
+            return cursor.rowcount
+
+    def _truncate(self, dry_run):
+        models = LEVEL_MODELS + [ArgoProfileData, ArgoSourceFile]
+        if dry_run:
+            for model in models:
+                self.stdout.write(f'{model._meta.db_table}: {model.objects.count()} rows')
+            return
+
+        alias = router.db_for_write(ArgoProfileData)
+        connection = connections[alias]
+        # The backend's flush SQL: TRUNCATE on PostgreSQL, unfiltered DELETE on SQLite
+        tables = [model._meta.db_table for model in models]
+        sql_list = connection.ops.sql_flush(no_style(), tables, allow_cascade=True)
+        connection.ops.execute_sql_flush(sql_list)
+        DataGeneration.bump()
+        DataGeneration.bump(DataGeneration.PROFILE_EDITS)
+        self.stdout.write(self.style.SUCCESS(f'✅ All Argo data deleted ({", ".join(tables)})'))
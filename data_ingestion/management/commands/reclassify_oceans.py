@@ -0,0 +1,44 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from data_ingestion.models import ArgoProfileData, DataGeneration
+from data_ingestion.services import classify_oceans
+
+class Command(BaseCommand):
+    help = 'Recompute ocean_name for stored Argo profiles with the batch ocean classifier'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help='Profiles classified per batch')
+        parser.add_argument('--resolution', type=float, default=None,
+                            help='Lookup grid resolution in degrees (defaults to ARGO_OCEAN_GRID_RESOLUTION; 0 for exact)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk, scanned, changed = 0, 0, 0
+
+        while True:
+            # Keyset pagination over the primary key keeps every batch an index range scan
+            rows = list(
+                ArgoProfileData.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', 'latitude', 'longitude', 'ocean_name')[:batch_size]
+            )
+            if not rows:
+                break
+            pks, lats, lons, current = (np.array(col) for col in zip(*rows))
+            names = classify_oceans(lats.astype(np.float64), lons.astype(np.float64), resolution=options['resolution'])
+
+            # One UPDATE per region for the rows whose name actually changed, committed together
+            # with the generation bump so no lookup caches a half-updated batch as current
+            stale = names != current
+            if stale.any():
+                with transaction.atomic(using=router.db_for_write(ArgoProfileData)):
+                    for name in np.unique(names[stale]):
+                        changed += ArgoProfileData.objects.filter(pk__in=pks[stale & (names == name)].tolist()).update(ocean_name=name)
+                    DataGeneration.bump()
+                    DataGeneration.bump(DataGeneration.PROFILE_EDITS)
+
+            scanned += len(rows)
+            last_pk = int(pks[-1])
+            self.stdout.write(f'Classified {scanned} profiles, {changed} updated')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Reclassified {scanned} profiles ({changed} changed)'))
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from data_ingestion.services import claim_next_job, run_ingestion_job
+
+class Command(BaseCommand):
+    help = 'Run queued ARGO ingestion jobs (started through the ingest-url API) in this process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty instead of polling')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Decode processes per job (defaults to ARGO_DECODE_WORKERS)')
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Concurrent downloads per job (defaults to ARGO_DOWNLOAD_CONCURRENCY)')
+
+    def handle(self, *args, **options):
+        self.stdout.write('🛠️ Ingestion worker started')
+        while True:
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f'▶️ Running job {job.pk}: {job.source_url}')
+            job = run_ingestion_job(job, concurrency=options['concurrency'], workers=options['workers'])
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Job {job.pk} {job.status}: {job.files_done} files, {job.profiles_done} profiles, '
+                f'{job.measurements_done} measurements'
+            ))
+        self.stdout.write('Ingestion worker stopped: queue is empty')
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0005_alter_argoprofiledata_juld_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArgoSourceFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(help_text='Source URL of the NetCDF file', max_length=500, unique=True)),
+                ('size', models.BigIntegerField(blank=True, help_text='Size of the downloaded file in bytes', null=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=200)),
+                ('last_modified', models.CharField(blank=True, default='', help_text='Last-Modified header as sent by the server', max_length=100)),
+                ('content_hash', models.CharField(blank=True, default='', help_text='SHA-256 of the file content', max_length=64)),
+                ('profile_count', models.IntegerField(default=0)),
+                ('measurement_count', models.IntegerField(default=0)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('complete', 'Complete'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10)),
+                ('error', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'ARGO Source File',
+                'verbose_name_plural': 'ARGO Source Files',
+                'ordering': ['url'],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0006_argosourcefile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_url', models.CharField(help_text='ARGO URL to ingest (single .nc file or directory to crawl)', max_length=500)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], db_index=True, default='queued', max_length=10)),
+                ('cancel_requested', models.BooleanField(default=False)),
+                ('files_done', models.IntegerField(default=0)),
+                ('files_failed', models.IntegerField(default=0)),
+                ('profiles_done', models.IntegerField(default=0)),
+                ('measurements_done', models.BigIntegerField(default=0)),
+                ('errors', models.TextField(blank=True, default='', help_text='One line per failed file (most recent last)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Ingestion Job',
+                'verbose_name_plural': 'Ingestion Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0007_ingestionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArgoProfileLevels',
+            fields=[
+                ('profile', models.OneToOneField(help_text='The profile these levels belong to', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='levels', serialize=False, to='data_ingestion.argoprofiledata')),
+                ('n_levels', models.IntegerField(help_text='Number of levels packed in each vector')),
+                ('pressure', models.BinaryField()),
+                ('temperature', models.BinaryField()),
+                ('temperature_adjusted', models.BinaryField()),
+                ('salinity', models.BinaryField()),
+                ('salinity_adjusted', models.BinaryField()),
+                ('pres_qc', models.BinaryField()),
+                ('temp_qc', models.BinaryField()),
+                ('psal_qc', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'ARGO Profile Levels',
+                'verbose_name_plural': 'ARGO Profile Levels',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0008_argoprofilelevels'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArgoProfileSummary',
+            fields=[
+                ('profile', models.OneToOneField(help_text='The profile these statistics describe', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='data_ingestion.argoprofiledata')),
+                ('n_levels', models.IntegerField(help_text='Number of stored levels')),
+                ('pressure_min', models.FloatField(blank=True, null=True)),
+                ('pressure_max', models.FloatField(blank=True, null=True)),
+                ('pressure_mean', models.FloatField(blank=True, null=True)),
+                ('temperature_mean', models.FloatField(blank=True, null=True)),
+                ('temperature_min', models.FloatField(blank=True, null=True)),
+                ('temperature_max', models.FloatField(blank=True, null=True)),
+                ('salinity_mean', models.FloatField(blank=True, null=True)),
+                ('salinity_min', models.FloatField(blank=True, null=True)),
+                ('salinity_max', models.FloatField(blank=True, null=True)),
+                ('pres_qc_good', models.FloatField(blank=True, null=True)),
+                ('temp_qc_good', models.FloatField(blank=True, null=True)),
+                ('psal_qc_good', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'ARGO Profile Summary',
+                'verbose_name_plural': 'ARGO Profile Summaries',
+            },
+        ),
+    ]
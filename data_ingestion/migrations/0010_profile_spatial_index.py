@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:14
+
+import math
+
+from django.db import migrations, models
+
+
+def fill_grid_cells(apps, schema_editor):
+    # Same 1-degree cell numbering as services.grid_cells()
+    ArgoProfileData = apps.get_model('data_ingestion', 'ArgoProfileData')
+    # Read and write on the migration's own connection, not the routed "ingest" alias
+    profiles = ArgoProfileData.objects.using(schema_editor.connection.alias)
+    last_pk = 0
+    while True:
+        batch = list(profiles.filter(pk__gt=last_pk).order_by('pk')[:5000])
+        if not batch:
+            break
+        for profile in batch:
+            lat, lon = profile.latitude, profile.longitude
+            if lat is None or lon is None or math.isnan(lat) or math.isnan(lon):
+                profile.grid_cell = None
+                continue
+            row = min(max(int(math.floor(lat + 90)), 0), 179)
+            col = min(int(math.floor((lon + 180) % 360)), 359)
+            profile.grid_cell = row * 360 + col
+        profiles.bulk_update(batch, ['grid_cell'], batch_size=500)
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0009_argoprofilesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='argoprofiledata',
+            name='grid_cell',
+            field=models.IntegerField(blank=True, db_index=True, help_text='1-degree lat/lon cell id (row-major from -90/-180) used by spatial searches', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='argoprofiledata',
+            index=models.Index(fields=['latitude', 'longitude'], name='argo_profile_lat_lon_idx'),
+        ),
+        migrations.RunPython(fill_grid_cells, migrations.RunPython.noop),
+    ]
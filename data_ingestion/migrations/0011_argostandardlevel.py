@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0010_profile_spatial_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArgoStandardLevel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pressure', models.FloatField(help_text='Standard pressure (dbar)')),
+                ('temperature', models.FloatField(blank=True, help_text='Interpolated temperature (°C)', null=True)),
+                ('salinity', models.FloatField(blank=True, help_text='Interpolated practical salinity (psu)', null=True)),
+                ('profile', models.ForeignKey(help_text='The profile these values were interpolated from', on_delete=django.db.models.deletion.CASCADE, related_name='standard_levels', to='data_ingestion.argoprofiledata')),
+            ],
+            options={
+                'verbose_name': 'ARGO Standard Level',
+                'verbose_name_plural': 'ARGO Standard Levels',
+                'ordering': ['profile', 'pressure'],
+                'indexes': [models.Index(fields=['pressure', 'profile'], name='argo_std_level_pres_idx')],
+                'unique_together': {('profile', 'pressure')},
+            },
+        ),
+    ]
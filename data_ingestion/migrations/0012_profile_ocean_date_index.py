@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:19
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0011_argostandardlevel'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='argoprofiledata',
+            index=models.Index(django.db.models.functions.text.Lower('ocean_name'), models.F('juld_date'), name='argo_profile_ocean_date_idx'),
+        ),
+    ]
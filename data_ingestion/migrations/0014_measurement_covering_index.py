@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0013_datageneration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='argomeasurement',
+            index=models.Index(fields=['profile', 'pressure', 'pres_qc', 'temp_qc', 'psal_qc', 'temperature', 'salinity'], name='argo_meas_pres_qc_cover_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+import math
+
+from django.db import migrations
+
+
+def fix_dateline_grid_cells(apps, schema_editor):
+    # Profiles at exactly longitude 180 were put in column 0; services.grid_cells() now keeps
+    # them in column 359, where bbox_q() looks for them
+    ArgoProfileData = apps.get_model('data_ingestion', 'ArgoProfileData')
+    profiles = ArgoProfileData.objects.using(schema_editor.connection.alias)
+    batch = list(profiles.filter(longitude=180.0, latitude__isnull=False))
+    for profile in batch:
+        row = min(max(int(math.floor(profile.latitude + 90)), 0), 179)
+        profile.grid_cell = row * 360 + 359
+    profiles.bulk_update(batch, ['grid_cell'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0014_measurement_covering_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_dateline_grid_cells, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+import numpy as np
+from django.db import migrations
+from django.db.models import Avg, Count, F, Max, Min, Q
+
+# Same statistics as services.summarize_profile_levels()
+GOOD_QC_FLAGS = ('1', '2')
+STAT_FIELDS = ('pressure', 'temperature', 'salinity')
+QC_FIELDS = ('pres_qc', 'temp_qc', 'psal_qc')
+
+
+def summarize_rows(ArgoMeasurement, alias, pks):
+    """Summary field values of the profiles in pks stored as ArgoMeasurement rows, via GROUP BY."""
+    aggregates = {'n_levels': Count('id')}
+    for field in STAT_FIELDS:
+        aggregates[f'{field}_mean'] = Avg(field)
+        aggregates[f'{field}_min'] = Min(field)
+        aggregates[f'{field}_max'] = Max(field)
+    for field in QC_FIELDS:
+        aggregates[f'{field}_good'] = Count('id', filter=Q(**{f'{field}__in': GOOD_QC_FLAGS}))
+
+    rows = (
+        ArgoMeasurement.objects.using(alias).filter(profile_id__in=pks)
+        .values('profile_id').annotate(**aggregates)
+    )
+    for row in rows:
+        for field in QC_FIELDS:
+            row[f'{field}_good'] /= row['n_levels']
+        yield row
+
+
+def summarize_packed(ArgoProfileLevels, alias, pks):
+    """Summary field values of the profiles in pks stored as packed ArgoProfileLevels vectors."""
+    for levels in ArgoProfileLevels.objects.using(alias).filter(profile_id__in=pks, n_levels__gt=0):
+        row = {'profile_id': levels.profile_id, 'n_levels': levels.n_levels}
+        for field in STAT_FIELDS:
+            values = np.frombuffer(bytes(getattr(levels, field)), dtype='<f4').astype(float)
+            values = values[~np.isnan(values)]
+            row[f'{field}_mean'] = float(values.mean()) if len(values) else None
+            row[f'{field}_min'] = float(values.min()) if len(values) else None
+            row[f'{field}_max'] = float(values.max()) if len(values) else None
+        for field in QC_FIELDS:
+            flags = np.char.strip(np.char.decode(np.frombuffer(bytes(getattr(levels, field)), dtype='S1'), 'latin1'))
+            row[f'{field}_good'] = float(np.isin(flags, GOOD_QC_FLAGS).mean())
+        yield row
+
+
+def backfill_profile_summaries(apps, schema_editor):
+    # Profiles ingested before 0009 have no summary, and the lookup and grid endpoints
+    # only read profiles that have one (summary__isnull=False)
+    ArgoProfileData = apps.get_model('data_ingestion', 'ArgoProfileData')
+    ArgoMeasurement = apps.get_model('data_ingestion', 'ArgoMeasurement')
+    ArgoProfileLevels = apps.get_model('data_ingestion', 'ArgoProfileLevels')
+    ArgoProfileSummary = apps.get_model('data_ingestion', 'ArgoProfileSummary')
+    DataGeneration = apps.get_model('data_ingestion', 'DataGeneration')
+    alias = schema_editor.connection.alias
+
+    written = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            ArgoProfileData.objects.using(alias).filter(pk__gt=last_pk, summary__isnull=True)
+            .order_by('pk').values_list('pk', flat=True)[:2000]
+        )
+        if not pks:
+            break
+        rows = {row['profile_id']: row for row in summarize_rows(ArgoMeasurement, alias, pks)}
+        for row in summarize_packed(ArgoProfileLevels, alias, [pk for pk in pks if pk not in rows]):
+            rows[row['profile_id']] = row
+        ArgoProfileSummary.objects.using(alias).bulk_create(
+            [ArgoProfileSummary(**row) for row in rows.values()], batch_size=500
+        )
+        written += len(rows)
+        last_pk = pks[-1]
+
+    if written:
+        DataGeneration.objects.using(alias).filter(name='profiles').update(value=F('value') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_ingestion', '0015_fix_dateline_grid_cells'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_profile_summaries, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
+import numpy as np
 from django.db import models
+from django.db.models.functions import Lower
 
 # --------------------------------------------------------------------------
 # 1. ARGO PROFILE MODEL (The Header/Metadata Table)
@@ -31,6 +33,12 @@ class ArgoProfileData(models.Model):
     longitude = models.FloatField(
         help_text="Best estimate of the profile's longitude"
     )
+    grid_cell = models.IntegerField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="1-degree lat/lon cell id (row-major from -90/-180) used by spatial searches"
+    )
 
     # Data Status and Source
     data_mode = models.CharField(
@@ -48,6 +56,12 @@ class ArgoProfileData(models.Model):
         # Ensures that a combination of float and cycle number is always unique
         unique_together = ('platform_number', 'cycle_number')
         ordering = ['platform_number', 'cycle_number']
+        indexes = [
+            # Bounding-box searches: latitude range first, longitude checked from the index
+            models.Index(fields=['latitude', 'longitude'], name='argo_profile_lat_lon_idx'),
+            # Case-insensitive ocean lookups (LOWER(ocean_name) = ...) with an optional date range
+            models.Index(Lower('ocean_name'), 'juld_date', name='argo_profile_ocean_date_idx'),
+        ]
         verbose_name = "ARGO Profile"
         verbose_name_plural = "ARGO Profiles"
 
@@ -126,9 +140,334 @@ class ArgoMeasurement(models.Model):
         # Ensures that for any given profile, the pressure level is unique
         unique_together = ('profile', 'pressure')
         ordering = ['profile', 'pressure']
+        indexes = [
+            # Covering index for depth/QC-filtered means: seeks to a profile's pressure range
+            # and reads the flags and values from the index instead of the table
+            models.Index(
+                fields=['profile', 'pressure', 'pres_qc', 'temp_qc', 'psal_qc', 'temperature', 'salinity'],
+                name='argo_meas_pres_qc_cover_idx',
+            ),
+        ]
         verbose_name = "ARGO Measurement"
         verbose_name_plural = "ARGO Measurements"
 
     def __str__(self):
         # FIX: Access the ocean_name through the related profile object
         return f"Profile {self.profile.data_centre_ref} @ {self.pressure} dbar in the {self.profile.ocean_name}"
+
+
+# --------------------------------------------------------------------------
+# 3. ARGO SOURCE FILE MODEL (The Ingestion Manifest)
+# Records every ingested source file so unchanged files can be skipped on re-sync.
+# --------------------------------------------------------------------------
+
+class ArgoSourceFile(models.Model):
+    """
+    One row per source NetCDF file seen by URL ingestion, with the HTTP validators and
+    content hash used to detect changes and the outcome of its last ingestion.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_COMPLETE = 'complete'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    url = models.CharField(
+        max_length=500,
+        unique=True,
+        help_text="Source URL of the NetCDF file"
+    )
+    size = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Size of the downloaded file in bytes"
+    )
+    etag = models.CharField(max_length=200, blank=True, default='')
+    last_modified = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        help_text="Last-Modified header as sent by the server"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        help_text="SHA-256 of the file content"
+    )
+    profile_count = models.IntegerField(default=0)
+    measurement_count = models.IntegerField(default=0)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_index=True
+    )
+    error = models.TextField(blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['url']
+        verbose_name = "ARGO Source File"
+        verbose_name_plural = "ARGO Source Files"
+
+    def __str__(self):
+        return f"{self.url} ({self.status})"
+
+
+# --------------------------------------------------------------------------
+# 4. INGESTION JOB MODEL (The Background Job Queue)
+# URL ingestions queued by the API and run by the run_ingestion_worker command.
+# --------------------------------------------------------------------------
+
+class IngestionJob(models.Model):
+    """
+    A queued URL ingestion with its live progress counters. The API creates it and returns
+    immediately; a worker process claims it, runs it and reports progress after every file.
+    """
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+
+    source_url = models.CharField(
+        max_length=500,
+        help_text="ARGO URL to ingest (single .nc file or directory to crawl)"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        db_index=True
+    )
+    cancel_requested = models.BooleanField(default=False)
+
+    # Progress Counters
+    files_done = models.IntegerField(default=0)
+    files_failed = models.IntegerField(default=0)
+    profiles_done = models.IntegerField(default=0)
+    measurements_done = models.BigIntegerField(default=0)
+    errors = models.TextField(
+        blank=True,
+        default='',
+        help_text="One line per failed file (most recent last)"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Ingestion Job"
+        verbose_name_plural = "Ingestion Jobs"
+
+    def __str__(self):
+        return f"Job {self.pk}: {self.source_url} ({self.status})"
+
+
+# --------------------------------------------------------------------------
+# 5. ARGO PROFILE LEVELS MODEL (Packed Level Storage)
+# One row per profile holding all of its levels as packed binary vectors.
+# Used instead of (or alongside) ArgoMeasurement when ARGO_LEVEL_STORAGE is "packed"/"both".
+# --------------------------------------------------------------------------
+
+class ArgoProfileLevels(models.Model):
+    """
+    A profile's level vectors packed as little-endian float32 (NaN for missing values) and
+    one ASCII byte per level for each QC flag. Read them through arrays().
+    """
+
+    FLOAT_FIELDS = ['pressure', 'temperature', 'temperature_adjusted', 'salinity', 'salinity_adjusted']
+    QC_FIELDS = ['pres_qc', 'temp_qc', 'psal_qc']
+    FLOAT_DTYPE = np.dtype('<f4')
+
+    profile = models.OneToOneField(
+        ArgoProfileData,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='levels',
+        help_text="The profile these levels belong to"
+    )
+    n_levels = models.IntegerField(help_text="Number of levels packed in each vector")
+
+    # Packed float32 vectors
+    pressure = models.BinaryField()
+    temperature = models.BinaryField()
+    temperature_adjusted = models.BinaryField()
+    salinity = models.BinaryField()
+    salinity_adjusted = models.BinaryField()
+
+    # Packed QC flags (one byte per level, blank when the flag was empty)
+    pres_qc = models.BinaryField()
+    temp_qc = models.BinaryField()
+    psal_qc = models.BinaryField()
+
+    class Meta:
+        verbose_name = "ARGO Profile Levels"
+        verbose_name_plural = "ARGO Profile Levels"
+
+    def __str__(self):
+        return f"Levels of profile {self.profile_id} ({self.n_levels} levels)"
+
+    @classmethod
+    def pack(cls, profile_id, columns):
+        """Builds an unsaved instance from one profile's flat level columns (NumPy arrays)."""
+        values = {
+            field: np.asarray(columns[field], dtype=cls.FLOAT_DTYPE).tobytes()
+            for field in cls.FLOAT_FIELDS
+        }
+        for field in cls.QC_FIELDS:
+            flags = np.asarray(columns[field], dtype=str)
+            values[field] = np.where(flags == '', ' ', flags).astype('S1').tobytes()
+        return cls(profile_id=profile_id, n_levels=len(columns['pressure']), **values)
+
+    def arrays(self):
+        """Decodes the packed vectors: float64 arrays (NaN = missing) and QC str arrays."""
+        out = {
+            field: np.frombuffer(bytes(getattr(self, field)), dtype=self.FLOAT_DTYPE).astype(float)
+            for field in self.FLOAT_FIELDS
+        }
+        for field in self.QC_FIELDS:
+            flags = np.frombuffer(bytes(getattr(self, field)), dtype='S1')
+            out[field] = np.char.strip(np.char.decode(flags, 'latin1'))
+        return out
+
+
+# --------------------------------------------------------------------------
+# 6. ARGO PROFILE SUMMARY MODEL (Precomputed Level Statistics)
+# Per-profile aggregates written during ingestion, so lookups never scan the level data.
+# --------------------------------------------------------------------------
+
+class ArgoProfileSummary(models.Model):
+    """
+    Level statistics of one profile. Means/min/max skip missing values (like SQL AVG/MIN/MAX);
+    the *_qc_good fractions count levels flagged 1 (good) or 2 (probably good).
+    """
+
+    GOOD_QC_FLAGS = ('1', '2')
+
+    profile = models.OneToOneField(
+        ArgoProfileData,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='summary',
+        help_text="The profile these statistics describe"
+    )
+    n_levels = models.IntegerField(help_text="Number of stored levels")
+
+    # Depth range
+    pressure_min = models.FloatField(null=True, blank=True)
+    pressure_max = models.FloatField(null=True, blank=True)
+    pressure_mean = models.FloatField(null=True, blank=True)
+
+    temperature_mean = models.FloatField(null=True, blank=True)
+    temperature_min = models.FloatField(null=True, blank=True)
+    temperature_max = models.FloatField(null=True, blank=True)
+
+    salinity_mean = models.FloatField(null=True, blank=True)
+    salinity_min = models.FloatField(null=True, blank=True)
+    salinity_max = models.FloatField(null=True, blank=True)
+
+    # Fraction of levels with a good QC flag (0-1)
+    pres_qc_good = models.FloatField(null=True, blank=True)
+    temp_qc_good = models.FloatField(null=True, blank=True)
+    psal_qc_good = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "ARGO Profile Summary"
+        verbose_name_plural = "ARGO Profile Summaries"
+
+    def __str__(self):
+        return f"Summary of profile {self.profile_id} ({self.n_levels} levels)"
+
+
+# --------------------------------------------------------------------------
+# 7. ARGO STANDARD LEVEL MODEL (Interpolated Level Data)
+# Temperature and salinity linearly interpolated onto the ARGO_STANDARD_PRESSURES grid at
+# ingestion, so depth slices across profiles are indexed lookups.
+# --------------------------------------------------------------------------
+
+class ArgoStandardLevel(models.Model):
+    """
+    A profile's values at one standard pressure. Only levels inside the profile's sampled
+    pressure range are stored (no extrapolation); levels flagged bad (QC 3/4) are ignored.
+    """
+
+    profile = models.ForeignKey(
+        ArgoProfileData,
+        on_delete=models.CASCADE,
+        related_name='standard_levels',
+        help_text="The profile these values were interpolated from"
+    )
+    pressure = models.FloatField(help_text="Standard pressure (dbar)")
+    temperature = models.FloatField(null=True, blank=True, help_text="Interpolated temperature (°C)")
+    salinity = models.FloatField(null=True, blank=True, help_text="Interpolated practical salinity (psu)")
+
+    class Meta:
+        unique_together = ('profile', 'pressure')
+        ordering = ['profile', 'pressure']
+        indexes = [
+            # Depth slices: every profile at one standard pressure
+            models.Index(fields=['pressure', 'profile'], name='argo_std_level_pres_idx'),
+        ]
+        verbose_name = "ARGO Standard Level"
+        verbose_name_plural = "ARGO Standard Levels"
+
+    def __str__(self):
+        return f"Profile {self.profile_id} @ {self.pressure} dbar (standard level)"
+
+
+# --------------------------------------------------------------------------
+# 8. DATA GENERATION MODEL (Change Counter)
+# Bumped in every transaction that changes profile data; caches key their entries on it.
+# --------------------------------------------------------------------------
+
+class DataGeneration(models.Model):
+    """
+    A named counter incremented whenever the data it covers changes ("profiles" for ARGO
+    profiles and their levels). Readers compare generations instead of tracking changes.
+    """
+
+    PROFILES = 'profiles'
+    # Bumped only when stored profiles are rewritten or deleted, not when new ones are added;
+    # the Parquet export rebuilds its archive when it changed since the last export
+    PROFILE_EDITS = 'profile_edits'
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Data Generation"
+        verbose_name_plural = "Data Generations"
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
+
+    @classmethod
+    def current(cls, name=PROFILES):
+        return cls.objects.filter(name=name).values_list('value', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls, name=PROFILES):
+        """Increments the counter; runs in the caller's transaction when called inside one."""
+        if cls.objects.filter(name=name).update(value=models.F('value') + 1):
+            return
+        _, created = cls.objects.get_or_create(name=name, defaults={'value': 1})
+        if not created:
+            # Another writer created the row first
+            cls.objects.filter(name=name).update(value=models.F('value') + 1)
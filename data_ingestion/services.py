@@ -1,15 +1,30 @@
 import os
 import re
+import json
+import hashlib
+import tempfile
 import time
 import random
+import queue
+import threading
+import multiprocessing
+import django
 import requests
+from requests.adapters import HTTPAdapter
 import numpy as np
 import xarray as xr
 from urllib.parse import urljoin
-from datetime import datetime, timedelta, timezone 
-from django.db import transaction
-from django.utils import timezone as django_timezone 
-from .models import ArgoProfileData, ArgoMeasurement 
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timezone
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+from django.utils import timezone as django_timezone
+from . import bulk_load
+from .models import ArgoProfileData, ArgoMeasurement, ArgoSourceFile, IngestionJob, ArgoProfileLevels, ArgoProfileSummary, ArgoStandardLevel, DataGeneration
 import logging
 import io
 import pandas as pd # Note: pandas is imported but not used, can be removed if not needed elsewhere
@@ -18,16 +33,91 @@ logger = logging.getLogger(__name__)
 
 # --- UTILITY FUNCTIONS ---
 
-def list_links(url, pattern=None, retries=3, backoff=2):
-    """Fetches links from a directory URL with retry logic."""
+class ListingCache:
+    """
+    Persistent directory-listing cache keyed by URL. Each entry keeps the page's links
+    together with its ETag/Last-Modified headers so an unchanged directory can be
+    revalidated with a conditional GET, or skipped outright while younger than max_age.
+    """
+
+    def __init__(self, path=None, max_age=None):
+        self.path = path if path is not None else getattr(settings, "ARGO_LISTING_CACHE_PATH", None)
+        self.max_age = max_age if max_age is not None else getattr(settings, "ARGO_LISTING_CACHE_MAX_AGE", 0)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as fh:
+                    self._entries = json.load(fh)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Ignoring unreadable listing cache {self.path}: {e}")
+
+    def get(self, url):
+        with self._lock:
+            return self._entries.get(url)
+
+    def is_fresh(self, entry):
+        """True if the entry is young enough to be used without revalidation."""
+        return bool(self.max_age) and time.time() - entry["checked_at"] < self.max_age
+
+    def put(self, url, links, etag=None, last_modified=None):
+        with self._lock:
+            self._entries[url] = {
+                "links": links,
+                "etag": etag,
+                "last_modified": last_modified,
+                "checked_at": time.time(),
+            }
+            self._dirty = True
+
+    def touch(self, url):
+        """Marks an entry as revalidated now (after a 304 Not Modified)."""
+        with self._lock:
+            self._entries[url]["checked_at"] = time.time()
+            self._dirty = True
+
+    def save(self):
+        """Writes the cache to disk atomically, if anything changed."""
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(self._entries, fh)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+def _filter_links(links, pattern):
+    return [l for l in links if re.search(pattern, l)] if pattern else list(links)
+
+def list_links(url, pattern=None, retries=3, backoff=2, session=None, cache=None):
+    """
+    Fetches links from a directory URL with retry logic. With a ListingCache, a cached page
+    is reused while fresh, and otherwise revalidated with If-None-Match/If-Modified-Since.
+    """
+    http = session or requests
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry):
+        return _filter_links(entry["links"], pattern)
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
     for attempt in range(retries):
         try:
-            resp = requests.get(url, timeout=20)
+            resp = http.get(url, timeout=20, headers=headers)
+            if resp.status_code == 304 and entry:
+                cache.touch(url)
+                return _filter_links(entry["links"], pattern)
             resp.raise_for_status()
             links = re.findall(r'href="([^"]+)"', resp.text)
-            if pattern:
-                links = [l for l in links if re.search(pattern, l)]
-            return links
+            if cache:
+                cache.put(url, links, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+            return _filter_links(links, pattern)
         except requests.exceptions.RequestException as e:
             wait = backoff * (2 ** attempt) + random.random()
             logger.warning(f"⚠️ Error fetching {url} (attempt {attempt+1}/{retries}): {e}. Retrying in {wait:.1f}s...")
@@ -35,30 +125,53 @@ def list_links(url, pattern=None, retries=3, backoff=2):
     logger.error(f"❌ Failed to fetch {url} after {retries} retries.")
     return []
 
-def recursive_nc_files(base_url, limit=None):
-    """Recursively crawls ARGO float directories for .nc files."""
+def _float_dir_nc_files(fdir_url, session=None, cache=None):
+    """Lists one float directory (once) and its 'profiles/' subdirectory, returning the .nc URLs."""
+    links = list_links(fdir_url, session=session, cache=cache)
+
+    # Files directly in the float directory (old style)
+    urls = [urljoin(fdir_url, fname) for fname in _filter_links(links, r'\_prof\.nc$')]
+
+    # The 'profiles/' subdirectory (new style)
+    if "profiles/" in links:
+        prof_url = urljoin(fdir_url, "profiles/")
+        urls.extend(urljoin(prof_url, fname) for fname in list_links(prof_url, r'\.nc$', session=session, cache=cache))
+    return urls
+
+def recursive_nc_files(base_url, limit=None, concurrency=None, cache=None):
+    """
+    Recursively crawls ARGO float directories for .nc files. Float directories are listed
+    concurrently and each page is fetched once; URLs are yielded in directory order.
+    Listings go through a persistent ListingCache (ARGO_LISTING_CACHE_PATH) unless one is given.
+    """
+    concurrency = max(1, concurrency or getattr(settings, "ARGO_CRAWL_CONCURRENCY", 8))
+    owns_cache = cache is None
+    if owns_cache:
+        cache = ListingCache()
+    session = build_http_session(concurrency)
+
     count = 0
-    # FIX: Regex for float_dirs should handle potential trailing slashes better or just use the given one
-    float_dirs = list_links(base_url, r'^[0-9]+/$') 
-    
-    for fdir in float_dirs:
-        fdir_url = urljoin(base_url, fdir)
-        
-        # Check for files directly in the float directory (old style)
-        for fname in list_links(fdir_url, r'\_prof\.nc$'):
-            full_url = urljoin(fdir_url, fname)
-            yield full_url
-            count += 1
-            if limit is not None and count >= limit: return
-
-        # Check for the 'profiles/' subdirectory (new style)
-        if "profiles/" in list_links(fdir_url):
-            prof_url = urljoin(fdir_url, "profiles/")
-            for fname in list_links(prof_url, r'\.nc$'):
-                full_url = urljoin(prof_url, fname)
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="argo-crawl")
+    futures = []
+    try:
+        # FIX: Regex for float_dirs should handle potential trailing slashes better or just use the given one
+        float_dirs = list_links(base_url, r'^[0-9]+/$', session=session, cache=cache)
+        futures = [
+            pool.submit(_float_dir_nc_files, urljoin(base_url, fdir), session, cache)
+            for fdir in float_dirs
+        ]
+        for future in futures:
+            for full_url in future.result():
                 yield full_url
                 count += 1
                 if limit is not None and count >= limit: return
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=True)
+        session.close()
+        if owns_cache:
+            cache.save()
 
 def decode_bytes(x):
     """Decodes NetCDF byte strings to standard Python strings."""
@@ -70,8 +183,8 @@ def decode_bytes(x):
     return str(x).strip()
 
 def safe_index(var, i=0):
-    """Safely extracts a scalar value from an xarray variable, handling 0D arrays."""
-    val = var.values
+    """Safely extracts a scalar value from an xarray variable (or its loaded array), handling 0D arrays."""
+    val = getattr(var, "values", var)
     if np.ndim(val) == 0:
         return val
     else:
@@ -83,65 +196,77 @@ def safe_index(var, i=0):
                 return np.nan
             return None # Or "" based on expected default for string/object
             
-def julian_to_datetime(juld_val):
-    """
-    Converts Argo Julian Day (days since 1950-01-01) OR misinterpreted epoch-based values
-    into a timezone-aware datetime (UTC).
+_ARGO_EPOCH_OFFSET_US = 7305 * 86_400_000_000  # 1950-01-01 → 1970-01-01, in microseconds
+_MAX_DATETIME64_NS_US = np.iinfo(np.int64).max // 1000  # Largest |µs| representable as datetime64[ns]
 
-    Handles:
-    1. Standard Argo JULD: float days since 1950-01-01.
-    2. Large numbers (~1e18): nanoseconds since UNIX epoch.
-    3. Large numbers (~1e12-1e15): milliseconds or microseconds since UNIX epoch.
-    """
-    if isinstance(juld_val, np.ndarray):
-        juld_val = juld_val.item()
+def _juld_as_float(values):
+    """Coerces an object array of JULD values (numbers, datetime64, None, bytes...) to float64, NaN where impossible."""
+    out = np.full(values.shape, np.nan, dtype=np.float64)
+    for idx, value in np.ndenumerate(values):
+        try:
+            if isinstance(value, np.datetime64):
+                # Same interpretation as float(datetime64): ns since the UNIX epoch
+                value = value.astype("datetime64[ns]").astype(np.int64) if not np.isnat(value) else np.nan
+            out[idx] = float(value)
+        except (ValueError, TypeError):
+            pass
+    return out
 
-    if juld_val is None:
-        return None
+def julian_to_datetime64(juld_values):
+    """
+    Vectorized JULD decoder: converts an array of Argo JULD values into datetime64[ns] in one pass.
 
-    try:
-        juld_numeric = float(juld_val)
-    except (ValueError, TypeError):
-        logger.error(f"Cannot convert JULD value {juld_val} to float.")
-        return None
+    Handles the same inputs as julian_to_datetime:
+    1. Standard Argo JULD: float days since 1950-01-01 (0 to 50000).
+    2. Large numbers (>1e17): nanoseconds since UNIX epoch.
+    3. Large numbers (1e12-1e17): milliseconds (<1e14) or microseconds since UNIX epoch.
+    datetime64 input (JULD already decoded by xarray) is passed through.
+    Values are rounded to microseconds, like datetime arithmetic. Missing or uninterpretable
+    entries become NaT; uninterpretable ones are counted in one log line, not one per value.
+    """
+    arr = np.asarray(juld_values)
+    if arr.dtype.kind == 'M':
+        return arr.astype("datetime64[ns]")
+    # Object and text arrays are coerced value by value, so one bad entry only loses itself
+    values = _juld_as_float(arr) if arr.dtype.kind in "OUS" else arr.astype(np.float64)
 
-    if np.isnan(juld_numeric):
-        return None
+    # Microseconds since the UNIX epoch for each interpretation; NaN where none applies
+    micros = np.full(values.shape, np.nan, dtype=np.float64)
+    days = (values >= 0) & (values <= 50000)
+    ns_epoch = values > 1e17
+    ms_epoch = (values > 1e12) & (values < 1e14)
+    us_epoch = (values >= 1e14) & (values < 1e17)
+    # Whole and fractional days are scaled separately, rounding like timedelta(days=...)
+    day_frac, whole_days = np.modf(values[days])
+    micros[days] = whole_days * 86_400_000_000 + np.round(day_frac * 86_400_000_000) - _ARGO_EPOCH_OFFSET_US
+    # Epoch values are converted to seconds first, rounding like datetime.utcfromtimestamp
+    for mask, scale in ((ns_epoch, 1e9), (ms_epoch, 1e3), (us_epoch, 1e6)):
+        sec_frac, whole_secs = np.modf(values[mask] / scale)
+        micros[mask] = whole_secs * 1_000_000 + np.round(sec_frac * 1_000_000)
 
-    reference_date = datetime(1950, 1, 1)
+    valid = np.abs(micros) <= _MAX_DATETIME64_NS_US  # False for NaN
+    uninterpretable = np.count_nonzero(~valid & ~np.isnan(values))
+    if uninterpretable:
+        logger.warning(f"⚠️ {uninterpretable} JULD values could not be interpreted")
 
-    # --- CASE 1: Standard Argo JULD (days since 1950-01-01) ---
-    if 0 <= juld_numeric <= 50000:  # valid range until ~2087
-        try:
-            naive_dt = reference_date + timedelta(days=juld_numeric)
-            return django_timezone.make_aware(naive_dt, timezone.utc)
-        except OverflowError:
-            logger.error(f"❌ Overflow in timedelta for JULD={juld_numeric}")
-            return None
-
-    # --- CASE 2: Nanoseconds since UNIX epoch (common with 1e18 scale) ---
-    if juld_numeric > 1e17:  
-        try:
-            naive_dt = datetime.utcfromtimestamp(juld_numeric / 1e9)
-            logger.info(f"🔄 Interpreted JULD={juld_numeric:.2e} as ns since epoch → {naive_dt}")
-            return django_timezone.make_aware(naive_dt, timezone.utc)
-        except Exception as e:
-            logger.error(f"❌ Failed nanosecond conversion for {juld_numeric}: {e}")
-            return None
+    out = np.full(values.shape, np.datetime64("NaT"), dtype="datetime64[ns]")
+    out[valid] = (micros[valid].astype(np.int64) * 1000).astype("datetime64[ns]")
+    return out
 
-    # --- CASE 3: Microseconds / Milliseconds since epoch ---
-    if 1e12 < juld_numeric < 1e17:  
-        scale = 1e3 if juld_numeric < 1e14 else 1e6
-        try:
-            naive_dt = datetime.utcfromtimestamp(juld_numeric / scale)
-            logger.info(f"🔄 Interpreted JULD={juld_numeric:.2e} as epoch/{int(scale)} → {naive_dt}")
-            return django_timezone.make_aware(naive_dt, timezone.utc)
-        except Exception as e:
-            logger.error(f"❌ Failed scaled epoch conversion for {juld_numeric}: {e}")
-            return None
+def datetime64_to_datetimes(values):
+    """Converts a datetime64 array to a list of timezone-aware (UTC) datetimes, with None for NaT."""
+    naive = np.asarray(values).astype("datetime64[us]").astype(object)
+    return [dt.replace(tzinfo=timezone.utc) if dt is not None else None for dt in naive.ravel()]
 
-    logger.warning(f"⚠️ JULD value {juld_numeric} could not be interpreted")
-    return None
+def julian_to_datetime(juld_val):
+    """
+    Converts one Argo Julian Day (days since 1950-01-01) OR misinterpreted epoch-based value
+    into a timezone-aware datetime (UTC). Thin wrapper around julian_to_datetime64, so scalar
+    and batch conversions share one decoder.
+    """
+    if juld_val is None:
+        return None
+    return datetime64_to_datetimes(julian_to_datetime64(np.ravel(juld_val)[:1]))[0]
 
 
 
@@ -167,232 +292,1093 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     # Small correction for arctan2 for better numerical stability (though arcsin is fine)
     return 2 * R * np.arcsin(np.sqrt(a))
 
+_OCEAN_NAMES = np.array(list(OCEAN_COORDS) + ["Unknown"], dtype=object)
+_OCEAN_LATS = np.array([coords["lat"] for coords in OCEAN_COORDS.values()], dtype=np.float64)
+_OCEAN_LONS = np.array([coords["lon"] for coords in OCEAN_COORDS.values()], dtype=np.float64)
+_UNKNOWN_OCEAN = len(OCEAN_COORDS)  # Index of "Unknown" in _OCEAN_NAMES
+
+def _nearest_ocean_index(lats, lons):
+    """Index into _OCEAN_NAMES of the nearest OCEAN_COORDS point for each (lat, lon); NaN gives Unknown."""
+    valid = ~(np.isnan(lats) | np.isnan(lons))
+    index = np.full(lats.shape, _UNKNOWN_OCEAN, dtype=np.uint8)
+    # (points, oceans) distance matrix; argmin keeps the first ocean on ties, like the old scalar loop
+    distances = haversine_distance(lats[valid][:, None], lons[valid][:, None], _OCEAN_LATS, _OCEAN_LONS)
+    index[valid] = np.argmin(distances, axis=1)
+    return index
+
+class OceanLookupGrid:
+    """
+    Precomputed lat/lon raster holding the nearest ocean for every cell of a fixed resolution
+    (degrees), so classification is one array lookup per point. Cells are classified at their
+    centre, so near a region boundary the result can differ from the exact classifier.
+    """
+
+    def __init__(self, resolution):
+        self.resolution = float(resolution)
+        self.n_lat = int(np.ceil(180 / self.resolution))
+        self.n_lon = int(np.ceil(360 / self.resolution))
+        lat_centres = -90 + (np.arange(self.n_lat) + 0.5) * self.resolution
+        lon_centres = -180 + (np.arange(self.n_lon) + 0.5) * self.resolution
+
+        self.index = np.empty((self.n_lat, self.n_lon), dtype=np.uint8)
+        # Classify a band of rows at a time to keep the distance matrix small
+        rows_per_band = max(1, 200_000 // self.n_lon)
+        for start in range(0, self.n_lat, rows_per_band):
+            band_lats, band_lons = np.meshgrid(lat_centres[start:start + rows_per_band], lon_centres, indexing="ij")
+            self.index[start:start + rows_per_band] = _nearest_ocean_index(band_lats.ravel(), band_lons.ravel()).reshape(band_lats.shape)
+
+    def lookup_index(self, lats, lons):
+        valid = ~(np.isnan(lats) | np.isnan(lons))
+        index = np.full(lats.shape, _UNKNOWN_OCEAN, dtype=np.uint8)
+        rows = np.clip(((lats[valid] + 90) // self.resolution).astype(np.int64), 0, self.n_lat - 1)
+        cols = np.clip((((lons[valid] + 180) % 360) // self.resolution).astype(np.int64), 0, self.n_lon - 1)
+        index[valid] = self.index[rows, cols]
+        return index
+
+@lru_cache(maxsize=4)
+def get_ocean_lookup_grid(resolution):
+    """Builds (once per process) the OceanLookupGrid for a resolution."""
+    logger.info(f"🗺️ Building ocean lookup grid at {resolution}° resolution")
+    return OceanLookupGrid(resolution)
+
+def classify_oceans(lats, lons, resolution=None):
+    """
+    Batch version of get_nearest_ocean: returns an array of ocean/sea names for arrays of
+    latitudes and longitudes in one NumPy call. With a grid resolution (argument or
+    ARGO_OCEAN_GRID_RESOLUTION), points are answered from a precomputed OceanLookupGrid.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    if resolution is None:
+        resolution = getattr(settings, "ARGO_OCEAN_GRID_RESOLUTION", 0)
+    if resolution:
+        index = get_ocean_lookup_grid(float(resolution)).lookup_index(lats, lons)
+    else:
+        index = _nearest_ocean_index(lats, lons)
+    return _OCEAN_NAMES[index]
+
 def get_nearest_ocean(lat, lon):
     """Determines the nearest defined ocean or sea name based on coordinates."""
-    if np.isnan(lat) or np.isnan(lon):
-        return "Unknown"
-    nearest, min_dist = "Unknown", float("inf")
-    # Ensure lat/lon are floats for haversine
-    lat, lon = float(lat), float(lon)
-    for ocean, coords in OCEAN_COORDS.items():
-        d = haversine_distance(lat, lon, coords["lat"], coords["lon"])
-        if d < min_dist:
-            min_dist, nearest = d, ocean
-    return nearest
-
-def _extract_profile_array(ds, var_name, i):
-    """
-    Safely extracts an xarray variable array for profile 'i', handling single-profile files.
-    """
-    # Check if the variable exists and is not a scalar (often due to 'N_MEASUREMENT' dim)
+    return classify_oceans([lat], [lon])[0]
+
+# --- SPATIAL SEARCH ---
+# Profiles carry a 1-degree grid_cell id (row-major from -90/-180) next to a (latitude, longitude)
+# index. Small boxes are answered as a few grid_cell index ranges, large ones by the lat/lon index.
+
+GRID_COLUMNS = 360
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE = 2 * np.pi * EARTH_RADIUS_KM / 360
+# Above this many grid_cell ranges a box is cheaper to scan through the lat/lon index
+MAX_GRID_CELL_RANGES = 32
+
+def grid_cells(lats, lons):
+    """
+    Vectorized 1-degree cell ids for arrays of coordinates (longitudes wrap at the dateline).
+    Returns: int64 array, -1 where a coordinate is NaN
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    valid = ~(np.isnan(lats) | np.isnan(lons))
+    rows = np.clip(np.floor(np.where(valid, lats, 0) + 90), 0, 179)
+    shifted = np.where(valid, lons, 0) + 180
+    # Wrap longitudes outside [-180, 180], but keep 180 itself in the last column, where
+    # bbox_q() looks for it, instead of wrapping it to column 0
+    shifted = np.where((shifted >= 0) & (shifted <= 360), shifted, np.mod(shifted, 360))
+    cols = np.clip(np.floor(shifted), 0, GRID_COLUMNS - 1)
+    return np.where(valid, rows * GRID_COLUMNS + cols, -1).astype(np.int64)
+
+def _wrap_longitude(lon):
+    return ((lon + 180.0) % 360.0) - 180.0
+
+def longitude_ranges(min_lon, max_lon):
+    """
+    Splits a longitude interval into non-wrapping [lo, hi] ranges. min_lon > max_lon means
+    the interval crosses the dateline (e.g. 170..-170).
+    """
+    min_lon = -180.0 if min_lon is None else float(min_lon)
+    max_lon = 180.0 if max_lon is None else float(max_lon)
+    if min_lon <= max_lon:
+        return [(min_lon, max_lon)]
+    return [(min_lon, 180.0), (-180.0, max_lon)]
+
+def bbox_q(min_lat=None, max_lat=None, min_lon=None, max_lon=None):
+    """
+    Builds the ArgoProfileData filter for a bounding box (inclusive, dateline-aware).
+    The exact lat/lon conditions are always included; for small boxes the matching grid_cell
+    ranges are added so the grid_cell index narrows the scan.
+    """
+    q = Q()
+    if min_lat is not None:
+        q &= Q(latitude__gte=min_lat)
+    if max_lat is not None:
+        q &= Q(latitude__lte=max_lat)
+    if min_lon is None and max_lon is None:
+        return q
+
+    lon_ranges = longitude_ranges(min_lon, max_lon)
+    lon_q = Q()
+    for lo, hi in lon_ranges:
+        lon_q |= Q(longitude__gte=lo, longitude__lte=hi)
+    q &= lon_q
+
+    first_row = int(np.clip(np.floor((-90.0 if min_lat is None else min_lat) + 90), 0, 179))
+    last_row = int(np.clip(np.floor((90.0 if max_lat is None else max_lat) + 90), 0, 179))
+    if (last_row - first_row + 1) * len(lon_ranges) <= MAX_GRID_CELL_RANGES:
+        cell_q = Q()
+        for row in range(first_row, last_row + 1):
+            for lo, hi in lon_ranges:
+                first_col = int(np.clip(np.floor(lo + 180), 0, GRID_COLUMNS - 1))
+                last_col = int(np.clip(np.floor(hi + 180), 0, GRID_COLUMNS - 1))
+                cell_q |= Q(grid_cell__range=(row * GRID_COLUMNS + first_col, row * GRID_COLUMNS + last_col))
+        q &= cell_q
+    return q
+
+def radius_bounds(lat, lon, radius_km):
+    """
+    Bounding box enclosing the circle of radius_km around (lat, lon).
+    Returns: (min_lat, max_lat, min_lon, max_lon); the longitudes are None when the circle
+    spans every longitude (near a pole), and min_lon > max_lon when it crosses the dateline.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return min_lat, max_lat, None, None
+    # Widest longitude span of the circle is at its most poleward latitude
+    dlon = dlat / np.cos(np.radians(max(abs(min_lat), abs(max_lat))))
+    if dlon >= 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, _wrap_longitude(lon - dlon), _wrap_longitude(lon + dlon)
+
+def within_radius(queryset, lat, lon, radius_km):
+    """
+    Restricts an ArgoProfileData queryset to profiles within radius_km of (lat, lon):
+    bounding-box prefilter on the spatial indexes, then the exact haversine distance,
+    computed in the database and annotated as distance_km.
+    """
+    queryset = queryset.filter(bbox_q(*radius_bounds(lat, lon, radius_km)))
+    lat_value = Value(float(lat), output_field=FloatField())
+    lon_value = Value(float(lon), output_field=FloatField())
+    a = (
+        Power(Sin((Radians(F("latitude")) - Radians(lat_value)) / 2), 2)
+        + Cos(Radians(lat_value)) * Cos(Radians(F("latitude")))
+        * Power(Sin((Radians(F("longitude")) - Radians(lon_value)) / 2), 2)
+    )
+    # Least() guards asin against rounding just above 1 for antipodal points
+    distance = 2 * EARTH_RADIUS_KM * ASin(Least(Sqrt(a), Value(1.0)))
+    return queryset.annotate(distance_km=distance).filter(distance_km__lte=radius_km)
+
+# --- VECTORIZED LEVEL EXTRACTION ---
+
+# Level variables read as whole (N_PROF, N_LEVELS) arrays, keyed by ArgoMeasurement field name
+LEVEL_VARIABLES = {
+    "pressure": "PRES",
+    "temperature": "TEMP",
+    "temperature_adjusted": "TEMP_ADJUSTED",
+    "salinity": "PSAL",
+    "salinity_adjusted": "PSAL_ADJUSTED",
+}
+QC_VARIABLES = {
+    "pres_qc": "PRES_QC",
+    "temp_qc": "TEMP_QC",
+    "psal_qc": "PSAL_QC",
+}
+# Column order of the measurement rows handed to the bulk loader
+MEASUREMENT_FIELDS = ["profile_id", *LEVEL_VARIABLES, *QC_VARIABLES]
+
+def _profile_matrix(ds, var_name, shape, is_qc_flag=False):
+    """
+    Returns a level variable as an (N_PROF, N_LEVELS) array. Falls back to an array
+    filled with NaN (or b'9' for QC flags) if the variable is missing or its size
+    does not match PRES, mirroring the old per-profile default handling.
+    """
+    if is_qc_flag:
+        default = np.full(shape, b'9', dtype='S1')
+    else:
+        default = np.full(shape, np.nan, dtype=np.float64)
+
     if var_name not in ds:
-        raise KeyError(f"Variable {var_name} not found in dataset.")
-        
-    var = ds[var_name]
-
-    # Handle the 'N_PROF' dimension: is it present and larger than 1?
-    if 'N_PROF' in var.dims and var.sizes.get('N_PROF', 1) > 1:
-        # Multi-profile file: use isel
-        return var.isel(N_PROF=i).values.flatten()
-    elif 'N_PROF' not in var.dims or var.sizes.get('N_PROF', 1) == 1:
-        # Single-profile file (or variable only has N_LEVELS/N_MEASUREMENT): return array directly
-        return var.values.flatten()
+        logger.debug(f"Variable {var_name} not found in dataset. Using NaN/9 default.")
+        return default
+
+    values = np.asarray(ds[var_name].values)
+    if values.size != default.size:
+        logger.debug(f"Variable {var_name} size mismatch ({values.size} vs {default.size}). Using NaN/9 default.")
+        return default
+
+    values = values.reshape(shape)
+    return values if is_qc_flag else values.astype(np.float64, copy=False)
+
+def extract_level_arrays(ds, n_profiles):
+    """
+    Pulls PRES/TEMP/PSAL(+_ADJUSTED) and the QC flags out of the dataset as whole
+    (N_PROF, N_LEVELS) arrays in one read per variable.
+    """
+    if "PRES" in ds:
+        pres = np.asarray(ds["PRES"].values, dtype=np.float64).reshape(n_profiles, -1)
     else:
-        # Should not happen, but safe fallback
-        raise ValueError(f"Unexpected dimensions for {var_name}")
+        logger.debug("Variable PRES not found in dataset. No level data will be saved.")
+        pres = np.empty((n_profiles, 0), dtype=np.float64)
 
+    levels = {"pressure": pres}
+    for field, var_name in LEVEL_VARIABLES.items():
+        if field != "pressure":
+            levels[field] = _profile_matrix(ds, var_name, pres.shape)
+    for field, var_name in QC_VARIABLES.items():
+        levels[field] = _profile_matrix(ds, var_name, pres.shape, is_qc_flag=True)
+    return levels
 
-def get_array_or_default(ds, var_name, i, is_qc_flag=False):
+def decode_qc_array(arr):
+    """Decodes an array of NetCDF QC flag bytes to stripped strings in one array operation."""
+    arr = np.asarray(arr)
+    if arr.dtype.kind == 'S':
+        arr = np.char.decode(arr, 'latin1')
+    elif arr.dtype.kind == 'O':
+        arr = np.array([decode_bytes(x) for x in arr.ravel()], dtype=str).reshape(arr.shape)
+    return np.char.strip(arr.astype(str))
+
+def flatten_level_arrays(levels):
     """
-    Retrieves the array for a variable, or returns a default array of the correct size 
-    if the variable is missing or the profile index is invalid.
+    Applies the valid-pressure mask to (N_PROF, N_LEVELS) level arrays and returns flat
+    columns. 'profile_index' holds the source profile of every kept level; rows stay in
+    row-major order, so each profile's levels are contiguous.
     """
-    pres_arr = None
-    try:
-        # 1. Get reference array size from pressure
-        pres_arr = _extract_profile_array(ds, "PRES", i)
-        array_size = len(pres_arr)
-        # Determine the default dtype based on the pressure array's type if possible
-        default_dtype = pres_arr.dtype
-    except Exception as e:
-        # If PRES is completely missing or unextractable, return small default array
-        logger.debug(f"Could not extract reference PRES array: {e}. Returning size 1 default.")
-        if is_qc_flag:
-            return np.array([b'9'], dtype=np.bytes_)
-        else:
-            return np.array([np.nan], dtype=np.float64)
+    valid = ~np.isnan(levels["pressure"])
+    profile_index, _ = np.nonzero(valid)
+    pressure = levels["pressure"][valid]
 
+    # (profile, pressure) is unique in the database: keep the first of any repeated level,
+    # otherwise one such profile would roll back its whole batch
+    _, first = np.unique(np.column_stack([profile_index, pressure]), axis=0, return_index=True)
+    keep = np.zeros(len(pressure), dtype=bool)
+    keep[first] = True
+    if not keep.all():
+        logger.warning(f"⚠️ Dropped {int((~keep).sum())} repeated pressure levels")
 
-    # 2. Try to get the specific variable array
-    try:
-        arr = _extract_profile_array(ds, var_name, i)
-        
-        # 3. Handle length mismatch (crucial check for level data)
-        if len(arr) != array_size:
-            logger.debug(f"Variable {var_name} length mismatch ({len(arr)} vs {array_size}). Using NaN/9 default.")
-            raise ValueError("Length mismatch.")
-            
-        return arr
-        
-    except (KeyError, ValueError, IndexError) as e:
-        # 4. Fall through to default if extraction fails, variable is missing, or length mismatch occurs
-        logger.debug(f"Failed to extract {var_name} for profile {i} (Error: {e.__class__.__name__}). Using default.")
-        
-        # Determine the appropriate default value and dtype
-        if is_qc_flag:
-            default_val = b'9'
-            default_dtype = np.bytes_ # QC flags are usually byte strings
-        else:
-            default_val = np.nan
-            # If the variable was found but failed extraction/size check, use its dtype if available
-            if var_name in ds:
-                 # Check the type of the variable itself, not the values
-                 if np.issubdtype(ds[var_name].dtype, np.object_):
-                     default_dtype = np.object_ # For string-like arrays
-                 else:
-                     default_dtype = ds[var_name].dtype
-            else:
-                 default_dtype = np.float64
-                 
-        return np.full(array_size, default_val, dtype=default_dtype)
+    columns = {"profile_index": profile_index[keep]}
+    for field in LEVEL_VARIABLES:
+        columns[field] = levels[field][valid][keep]
+    for field in QC_VARIABLES:
+        columns[field] = decode_qc_array(levels[field][valid][keep])
+    return columns
+
+def _nullable(arr):
+    """Converts a float array to a list of Python floats, with NaN replaced by None."""
+    out = arr.astype(object)
+    out[np.isnan(arr)] = None
+    return out.tolist()
+
+def select_level_rows(columns, mask):
+    """Returns the flat level columns restricted to the rows where mask is True."""
+    return {field: arr[mask] for field, arr in columns.items()}
+
+def write_measurement_batch(profile_ids, columns):
+    """
+    Bulk-inserts a flat columnar level batch as ArgoMeasurement rows.
+    profile_ids gives the ArgoProfileData primary key for each row of the batch.
+    With ARGO_MEASUREMENT_LOADER = "raw" (the default) the rows go straight to the database
+    through bulk_load; "orm" builds ArgoMeasurement instances for bulk_create instead.
+    Returns: number of measurements saved
+    """
+    values = [_nullable(columns[field]) for field in LEVEL_VARIABLES]
+    qc_values = [columns[field].tolist() for field in QC_VARIABLES]
+    rows = zip(profile_ids, *values, *qc_values)
+
+    if getattr(settings, "ARGO_MEASUREMENT_LOADER", "raw") == "raw":
+        return bulk_load.load_rows(ArgoMeasurement, MEASUREMENT_FIELDS, rows)
+
+    measurements = [ArgoMeasurement(**dict(zip(MEASUREMENT_FIELDS, row))) for row in rows]
+    if measurements:
+        # Use batch size for very large files to prevent a single huge statement
+        ArgoMeasurement.objects.bulk_create(measurements, batch_size=5000)
+    return len(measurements)
+
+def _profile_segments(profile_ids):
+    """
+    Splits a batch whose rows are grouped by profile into contiguous segments.
+    Returns: (profile id per segment, segment start offsets)
+    """
+    ids = np.asarray(profile_ids)
+    starts = np.concatenate(([0], np.flatnonzero(ids[1:] != ids[:-1]) + 1))
+    return ids[starts], starts
+
+def write_packed_levels(profile_ids, columns):
+    """
+    Stores a flat columnar level batch as one ArgoProfileLevels row per profile.
+    Each profile's rows are contiguous in the batch (see flatten_level_arrays).
+    Returns: number of levels saved
+    """
+    if not profile_ids:
+        return 0
+    segment_ids, starts = _profile_segments(profile_ids)
+    ends = np.append(starts[1:], len(profile_ids))
+    fields = ArgoProfileLevels.FLOAT_FIELDS + ArgoProfileLevels.QC_FIELDS
+
+    packed = [
+        ArgoProfileLevels.pack(profile_id, {f: columns[f][start:end] for f in fields})
+        for profile_id, start, end in zip(segment_ids.tolist(), starts.tolist(), ends.tolist())
+    ]
+    ArgoProfileLevels.objects.bulk_create(packed, batch_size=500)
+    return len(profile_ids)
+
+def _segment_stats(values, starts):
+    """NaN-skipping per-segment (mean, min, max) arrays; all-NaN segments give NaN."""
+    missing = np.isnan(values)
+    counts = np.add.reduceat(~missing, starts)
+    sums = np.add.reduceat(np.where(missing, 0.0, values), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    # fmin/fmax ignore NaN unless the whole segment is NaN
+    return means, np.fmin.reduceat(values, starts), np.fmax.reduceat(values, starts)
+
+def summarize_profile_levels(profile_ids, columns):
+    """
+    Computes ArgoProfileSummary rows for a flat level batch grouped by profile, with one
+    reduceat pass per column instead of a query per profile.
+    Returns: list of unsaved ArgoProfileSummary
+    """
+    if not len(profile_ids):
+        return []
+    segment_ids, starts = _profile_segments(profile_ids)
+    n_levels = np.diff(np.append(starts, len(profile_ids)))
+    stats = {}
+    for field in ("pressure", "temperature", "salinity"):
+        values = np.asarray(columns[field], dtype=np.float64)
+        stats[f"{field}_mean"], stats[f"{field}_min"], stats[f"{field}_max"] = _segment_stats(values, starts)
+    for field in QC_VARIABLES:
+        good = np.isin(columns[field], ArgoProfileSummary.GOOD_QC_FLAGS)
+        stats[f"{field}_good"] = np.add.reduceat(good, starts) / n_levels
+
+    fields = list(stats)
+    summaries = []
+    for i, profile_id in enumerate(segment_ids.tolist()):
+        values = {f: float(stats[f][i]) for f in fields}
+        summaries.append(ArgoProfileSummary(
+            profile_id=profile_id,
+            n_levels=int(n_levels[i]),
+            **{f: (None if np.isnan(v) else v) for f, v in values.items()},
+        ))
+    return summaries
+
+def write_profile_summaries(profile_ids, columns):
+    """Bulk-inserts the ArgoProfileSummary rows of a level batch. Returns: profiles summarized"""
+    summaries = summarize_profile_levels(profile_ids, columns)
+    ArgoProfileSummary.objects.bulk_create(summaries, batch_size=500)
+    return len(summaries)
+
+# --- STANDARD LEVELS ---
+
+DEFAULT_STANDARD_PRESSURES = [5, 10, 20, 30, 50, 75, 100, 125, 150, 200, 250, 300, 400, 500, 600,
+                              700, 800, 900, 1000, 1100, 1200, 1300, 1400, 1500, 1750, 2000]
+# Levels with these QC flags (probably bad / bad) are not interpolated
+BAD_QC_FLAGS = ("3", "4")
+# (variable, its QC flag) interpolated onto the standard grid
+STANDARD_LEVEL_VARIABLES = {"temperature": "temp_qc", "salinity": "psal_qc"}
+
+def standard_pressures():
+    return np.asarray(getattr(settings, "ARGO_STANDARD_PRESSURES", DEFAULT_STANDARD_PRESSURES), dtype=np.float64)
+
+def interpolate_segments(segments, n_segments, pressure, values, std_pressures):
+    """
+    Linearly interpolates every profile onto std_pressures at once. segments gives each
+    row's profile number (0..n_segments-1). All rows are merged into one sorted key array
+    (profile offset + pressure) and every (profile, standard pressure) query is answered with
+    a single searchsorted, so no Python loop runs per profile.
+    Returns: (n_segments, len(std_pressures)) array, NaN outside a profile's sampled range
+    """
+    n_std = len(std_pressures)
+    ok = ~(np.isnan(pressure) | np.isnan(values))
+    seg, pres, vals = segments[ok], pressure[ok], values[ok]
+    if not len(seg):
+        return np.full((n_segments, n_std), np.nan)
+
+    order = np.lexsort((pres, seg))
+    seg, pres, vals = seg[order], pres[order], vals[order]
+    low = min(pres.min(), std_pressures.min())
+    span = max(pres.max(), std_pressures.max()) - low + 1.0
+    keys = seg * span + (pres - low)
+
+    query_seg = np.repeat(np.arange(n_segments), n_std)
+    queries = query_seg * span + (np.tile(std_pressures, n_segments) - low)
+    right = np.searchsorted(keys, queries, side="left")
+    r = np.minimum(right, len(keys) - 1)
+    l = np.maximum(right - 1, 0)
+
+    exact = (right < len(keys)) & (keys[r] == queries) & (seg[r] == query_seg)
+    inside = (right > 0) & (right < len(keys)) & (seg[l] == query_seg) & (seg[r] == query_seg)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = (queries - keys[l]) / (keys[r] - keys[l])
+        interpolated = vals[l] + frac * (vals[r] - vals[l])
+    out = np.where(exact, vals[r], np.where(inside, interpolated, np.nan))
+    return out.reshape(n_segments, n_std)
+
+def standard_level_rows(profile_ids, columns):
+    """
+    Interpolates a flat level batch (grouped by profile) onto the standard pressure grid.
+    Returns: list of (profile_id, pressure, temperature, salinity) rows, None for missing
+    """
+    if not len(profile_ids):
+        return []
+    segment_ids, starts = _profile_segments(profile_ids)
+    segments = np.repeat(np.arange(len(segment_ids)), np.diff(np.append(starts, len(profile_ids))))
+    std = standard_pressures()
+    pressure = np.asarray(columns["pressure"], dtype=np.float64)
+    pres_bad = np.isin(columns["pres_qc"], BAD_QC_FLAGS)
+
+    grids = []
+    for field, qc_field in STANDARD_LEVEL_VARIABLES.items():
+        values = np.asarray(columns[field], dtype=np.float64)
+        values = np.where(pres_bad | np.isin(columns[qc_field], BAD_QC_FLAGS), np.nan, values)
+        grids.append(interpolate_segments(segments, len(segment_ids), pressure, values, std))
+
+    keep = ~np.all([np.isnan(g) for g in grids], axis=0)
+    seg_index, std_index = np.nonzero(keep)
+    ids = segment_ids[seg_index].tolist()
+    pressures = std[std_index].tolist()
+    values = [_nullable(g[keep]) for g in grids]
+    return list(zip(ids, pressures, *values))
+
+def write_standard_levels(profile_ids, columns):
+    """Stores the standard-level rows of a level batch. Returns: rows written"""
+    rows = standard_level_rows(profile_ids, columns)
+    return bulk_load.load_rows(ArgoStandardLevel, ["profile_id", "pressure", *STANDARD_LEVEL_VARIABLES], rows)
+
+def read_level_columns(profile_ids):
+    """
+    Reads the stored levels of the given profiles as flat columns grouped by profile:
+    floats with NaN for missing values and QC str arrays ('' when missing). Uses packed
+    ArgoProfileLevels rows when ARGO_LEVEL_STORAGE is "packed", ArgoMeasurement otherwise.
+    Returns: (profile id per level, {field: array})
+    """
+    fields = ArgoProfileLevels.FLOAT_FIELDS + ArgoProfileLevels.QC_FIELDS
+    if getattr(settings, "ARGO_LEVEL_STORAGE", "rows") == "packed":
+        ids, parts = [], {f: [] for f in fields}
+        for levels in ArgoProfileLevels.objects.filter(profile_id__in=profile_ids).order_by("profile_id"):
+            arrays = levels.arrays()
+            ids.append(np.full(levels.n_levels, levels.profile_id, dtype=np.int64))
+            for f in fields:
+                parts[f].append(arrays[f])
+        if not ids:
+            return np.array([], dtype=np.int64), {f: np.array([]) for f in fields}
+        return np.concatenate(ids), {f: np.concatenate(parts[f]) for f in fields}
+
+    rows = list(
+        ArgoMeasurement.objects.filter(profile_id__in=profile_ids)
+        .order_by("profile_id", "pressure")
+        .values_list("profile_id", *fields)
+    )
+    if not rows:
+        return np.array([], dtype=np.int64), {f: np.array([]) for f in fields}
+    ids, *values = zip(*rows)
+    columns = {f: np.array(v, dtype=np.float64) for f, v in zip(ArgoProfileLevels.FLOAT_FIELDS, values)}
+    for f, v in zip(ArgoProfileLevels.QC_FIELDS, values[len(ArgoProfileLevels.FLOAT_FIELDS):]):
+        columns[f] = np.array([flag or "" for flag in v], dtype=str)
+    return np.array(ids, dtype=np.int64), columns
+
+def level_means(profile_ids, min_pres=None, max_pres=None, qc=None):
+    """
+    Per-profile means over the levels inside [min_pres, max_pres] whose pres_qc is in qc
+    (any flag when qc is None); temperature/salinity also need their own flag in qc.
+    Used for packed level storage, where the database cannot filter levels.
+    Returns: {profile_id: (avg_temp, avg_sal, avg_pres)} for profiles with matching levels
+    """
+    level_ids, columns = read_level_columns(profile_ids)
+    if not len(level_ids):
+        return {}
+    pressure = np.asarray(columns["pressure"], dtype=np.float64)
+    keep = ~np.isnan(pressure)
+    if min_pres is not None:
+        keep &= pressure >= min_pres
+    if max_pres is not None:
+        keep &= pressure <= max_pres
+    if qc is not None:
+        keep &= np.isin(columns["pres_qc"], qc)
+
+    segment_ids, index = np.unique(level_ids, return_inverse=True)
+    counts = np.bincount(index[keep], minlength=len(segment_ids))
+
+    def means(values, mask):
+        mask = mask & ~np.isnan(values)
+        n = np.bincount(index[mask], minlength=len(segment_ids))
+        sums = np.bincount(index[mask], weights=values[mask], minlength=len(segment_ids))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, sums / np.maximum(n, 1), np.nan)
+
+    stats = []
+    for field, qc_field in (("temperature", "temp_qc"), ("salinity", "psal_qc")):
+        mask = keep if qc is None else keep & np.isin(columns[qc_field], qc)
+        stats.append(means(np.asarray(columns[field], dtype=np.float64), mask))
+    stats.append(means(pressure, keep))
+
+    return {
+        int(profile_id): tuple(None if np.isnan(s[i]) else float(s[i]) for s in stats)
+        for i, profile_id in enumerate(segment_ids.tolist())
+        if counts[i]
+    }
+
+# Data-mode precedence: a delayed-mode (D) profile supersedes an adjusted (A) one, which
+# supersedes real-time (R). Unknown modes rank with R.
+DATA_MODE_RANK = {"R": 0, "A": 1, "D": 2}
+
+def data_mode_rank(data_mode):
+    return DATA_MODE_RANK.get((data_mode or "R").strip().upper(), 0)
+
+def find_existing_profiles(keys):
+    """
+    Resolves which (platform_number, cycle_number) keys already exist in the DB with a
+    single set query instead of one exists() query per profile.
+    Returns: {key: (pk, data_mode)} for the keys found
+    """
+    if not keys:
+        return {}
+    platforms = {platform for platform, _ in keys}
+    cycles = {cycle for _, cycle in keys}
+    wanted = set(keys)
+    existing = ArgoProfileData.objects.filter(
+        platform_number__in=platforms, cycle_number__in=cycles
+    ).values_list("platform_number", "cycle_number", "pk", "data_mode")
+    return {
+        (platform, cycle): (pk, data_mode)
+        for platform, cycle, pk, data_mode in existing
+        if (platform, cycle) in wanted
+    }
 
 
 # --- CORE INGESTION FUNCTIONS ---
 
-def process_single_netcdf_file(file_content, file_source):
+class PartialIngestionError(Exception):
+    """Raised when some profile batches of a file could not be saved; .saved counts the measurements that were."""
+
+    def __init__(self, message, saved):
+        super().__init__(message)
+        self.saved = saved
+
+HEADER_VARIABLES = ("PLATFORM_NUMBER", "CYCLE_NUMBER", "LATITUDE", "LONGITUDE", "JULD", "DATA_MODE")
+
+def _read_profile_header(header_arrays, i):
     """
-    Processes a single NetCDF file (either from URL or upload) and saves data to Django DB.
+    Reads the header fields of profile i from the loaded header variable arrays.
+    Returns None if PLATFORM_NUMBER or CYCLE_NUMBER is missing.
+    """
+    # Decode bytes for PLATFORM_NUMBER and DATA_MODE
+    platform_number_raw = safe_index(header_arrays["PLATFORM_NUMBER"], i)
+    platform_number = decode_bytes(platform_number_raw) if platform_number_raw is not None else None
+    cycle_number_raw = safe_index(header_arrays["CYCLE_NUMBER"], i)
+    cycle_number = int(cycle_number_raw) if cycle_number_raw is not None and not np.isnan(float(cycle_number_raw)) else -999 # Use sentinel
+
+    if platform_number is None or platform_number == "" or cycle_number == -999:
+        return None
+
+    lat = float(safe_index(header_arrays["LATITUDE"], i))
+    lon = float(safe_index(header_arrays["LONGITUDE"], i))
+    data_mode_raw = safe_index(header_arrays["DATA_MODE"], i)
+
+    return {
+        "index": i,
+        "platform_number": platform_number,
+        "cycle_number": cycle_number,
+        "juld": safe_index(header_arrays["JULD"], i), # Raw value, decoded for the whole batch below
+        "latitude": lat,
+        "longitude": lon,
+        "data_mode": decode_bytes(data_mode_raw) if data_mode_raw is not None else "R", # Default to Real-Time
+    }
+
+# Header fields rewritten when a superseding profile replaces a stored one
+REPLACED_PROFILE_FIELDS = ["juld_date", "latitude", "longitude", "grid_cell", "ocean_name", "data_mode"]
+
+def _profile_header_fields(headers):
+    """ArgoProfileData field values (besides the key) for each header dict."""
+    cells = grid_cells([h["latitude"] for h in headers], [h["longitude"] for h in headers])
+    return [
+        {
+            "juld_date": h["juld_date"],
+            "latitude": h["latitude"],
+            "longitude": h["longitude"],
+            "grid_cell": int(cell) if cell >= 0 else None,
+            "ocean_name": h["ocean_name"],
+            "data_mode": h["data_mode"],
+        }
+        for h, cell in zip(headers, cells.tolist())
+    ]
+
+def _write_profile_levels(headers, pks, columns):
+    """
+    Writes the level data and summaries of saved profiles: headers[i] was saved as pks[i].
+    Must run inside the caller's transaction.
+    Returns: number of measurements saved
+    """
+    # Map each level row to the primary key of its profile
+    indices = np.array([h["index"] for h in headers])
+    pk_by_index = dict(zip(indices.tolist(), pks))
+    batch = select_level_rows(columns, np.isin(columns["profile_index"], indices))
+    profile_ids = [pk_by_index[i] for i in batch["profile_index"].tolist()]
+
+    storage = getattr(settings, "ARGO_LEVEL_STORAGE", "rows")
+    saved = 0
+    if storage in ("rows", "both"):
+        saved = write_measurement_batch(profile_ids, batch)
+    if storage in ("packed", "both"):
+        saved = write_packed_levels(profile_ids, batch)
+    write_profile_summaries(profile_ids, batch)
+    write_standard_levels(profile_ids, batch)
+    return saved
+
+def save_profile_batch(headers, columns):
+    """
+    Inserts a batch of new profiles and all of their level rows in one transaction.
+    headers are dicts from _read_profile_header; columns are the file's flat level columns.
+    Returns: number of measurements saved
+    """
+    profiles = [
+        ArgoProfileData(
+            platform_number=h["platform_number"],
+            cycle_number=h["cycle_number"],
+            data_centre_ref=f"{h['platform_number']}-{h['cycle_number']}", # Use the composite key for unique reference
+            **fields,
+        )
+        for h, fields in zip(headers, _profile_header_fields(headers))
+    ]
+
+    # All writes of the batch share the ingestion alias' transaction (see db_routers)
+    alias = router.db_for_write(ArgoProfileData)
+    with transaction.atomic(using=alias):
+        created = ArgoProfileData.objects.bulk_create(profiles)
+        if any(p.pk is None for p in created):
+            # Backends that cannot return ids from a bulk insert: resolve them with one query
+            # on the writing connection, which is the only one that sees the uncommitted rows
+            pk_by_ref = dict(ArgoProfileData.objects.using(alias).filter(
+                data_centre_ref__in=[p.data_centre_ref for p in created]
+            ).values_list("data_centre_ref", "pk"))
+            for p in created:
+                p.pk = pk_by_ref[p.data_centre_ref]
+
+        DataGeneration.bump()
+        return _write_profile_levels(headers, [p.pk for p in created], columns)
+
+def replace_profile_batch(headers, pks, columns):
+    """
+    Replaces stored profiles superseded by a higher data mode, in one transaction: the
+    headers are rewritten with one bulk UPDATE, the old level data is removed with set-based
+    DELETEs and the new levels are written as for new profiles. headers[i] replaces pks[i];
+    the primary keys (and so any references to the profiles) are kept.
+    Returns: number of measurements saved
+    """
+    profiles = [
+        ArgoProfileData(pk=pk, **fields)
+        for pk, fields in zip(pks, _profile_header_fields(headers))
+    ]
+
+    alias = router.db_for_write(ArgoProfileData)
+    with transaction.atomic(using=alias):
+        ArgoProfileData.objects.bulk_update(profiles, REPLACED_PROFILE_FIELDS, batch_size=500)
+        for model in (ArgoMeasurement, ArgoProfileLevels, ArgoProfileSummary, ArgoStandardLevel):
+            model.objects.filter(profile_id__in=pks).delete()
+        DataGeneration.bump()
+        DataGeneration.bump(DataGeneration.PROFILE_EDITS)
+        return _write_profile_levels(headers, pks, columns)
+
+def _open_netcdf(file_content):
+    """
+    Opens NetCDF bytes from memory, or a file path lazily: variables of a path-backed dataset
+    are only read (and not cached) when a slice of them is accessed.
+    """
+    if isinstance(file_content, (bytes, bytearray, memoryview)):
+        # Use io.BytesIO to read content from memory
+        return xr.open_dataset(io.BytesIO(file_content), decode_timedelta=False)
+    return xr.open_dataset(file_content, decode_timedelta=False, cache=False)
+
+def decode_dataset(ds, file_source, offset=0):
+    """
+    Decodes an opened dataset (or an N_PROF slice of one starting at profile `offset`) into a
+    compact, DB-free payload: the profile headers plus flat level columns (NumPy arrays).
+    """
+    # Determine profile count (safe default to 1 if N_PROF is not a dimension)
+    n_profiles = ds.sizes.get("N_PROF", 1) if 'N_PROF' in ds.sizes else 1
+
+    # Whole-slice level extraction: one read per variable, masked and flattened once
+    columns = flatten_level_arrays(extract_level_arrays(ds, n_profiles))
+
+    # Header variables are read once; a missing one fails each profile as before
+    header_arrays = {name: ds[name].values for name in HEADER_VARIABLES if name in ds}
+
+    headers = {}
+    for i in range(n_profiles):
+        try:
+            header = _read_profile_header(header_arrays, i)
+        except Exception as e:
+            logger.error(f"❌ Error processing profile {offset+i+1} in {file_source}: {e}", exc_info=True)
+            continue
+        if header is None:
+            logger.error(f"❌ Skipping profile {offset+i+1} in {file_source}: Missing PLATFORM_NUMBER or CYCLE_NUMBER.")
+            continue
+        # The first occurrence of a key inside a file wins
+        headers.setdefault((header["platform_number"], header["cycle_number"]), header)
+
+    # Dates and ocean names are computed for all headers at once
+    headers = list(headers.values())
+    juld_dates = datetime64_to_datetimes(julian_to_datetime64([h.pop("juld") for h in headers]))
+    ocean_names = classify_oceans([h["latitude"] for h in headers], [h["longitude"] for h in headers])
+    for header, juld_date, ocean_name in zip(headers, juld_dates, ocean_names):
+        header["juld_date"] = juld_date
+        header["ocean_name"] = ocean_name
+
+    return {"source": file_source, "headers": headers, "columns": columns}
+
+def decode_netcdf_file(file_content, file_source):
+    """
+    Decodes a whole NetCDF file (bytes or a path) into one payload. Touches no DB state,
+    so it can run in a worker process and hand its result to a single writer.
+    """
+    with _open_netcdf(file_content) as ds:
+        return decode_dataset(ds, file_source)
+
+def iter_decoded_slices(file_content, file_source, slice_size=None):
+    """
+    Decodes a NetCDF file (bytes or a path) in N_PROF slices of at most slice_size profiles,
+    yielding one payload per slice so peak memory is bounded by the slice, not the file.
+    """
+    slice_size = max(1, slice_size or getattr(settings, "ARGO_PROFILE_SLICE_SIZE", 500))
+    with _open_netcdf(file_content) as ds:
+        n_profiles = ds.sizes.get("N_PROF", 1)
+        if "N_PROF" not in ds.sizes or n_profiles <= slice_size:
+            yield decode_dataset(ds, file_source)
+            return
+        for start in range(0, n_profiles, slice_size):
+            yield decode_dataset(ds.isel(N_PROF=slice(start, start + slice_size)), file_source, offset=start)
+
+def _save_batch(save, batch, file_source):
+    """
+    Runs save(batch), which writes the batch in one transaction. If a constraint violation
+    rolls it back, the batch is retried one profile at a time so only the offending
+    profiles are lost.
+    Returns: (measurements saved, profiles that failed)
+    """
+    try:
+        return save(batch), 0
+    except IntegrityError as e:
+        if len(batch) == 1:
+            logger.error(f"❌ Could not save a profile from {file_source}: {e}")
+            return 0, 1
+        logger.warning(f"⚠️ {e} in a batch of {len(batch)} profiles from {file_source}. Retrying them one at a time.")
+
+    saved = failed = 0
+    for item in batch:
+        item_saved, item_failed = _save_batch(save, [item], file_source)
+        saved += item_saved
+        failed += item_failed
+    return saved, failed
+
+def save_decoded_file(payload, batch_size=None):
+    """
+    Saves a payload from decode_netcdf_file: existing profiles are resolved with one set
+    query, new ones are bulk-inserted and stored ones superseded by a higher data mode
+    (D > A > R) are replaced, batch_size profiles per transaction.
+    Returns: total_measurements_saved
+    """
+    batch_size = max(1, batch_size or getattr(settings, "ARGO_PROFILE_BATCH_SIZE", 500))
+    file_source, headers, columns = payload["source"], payload["headers"], payload["columns"]
+    total_measurements_saved = 0
+
+    existing = find_existing_profiles([(h["platform_number"], h["cycle_number"]) for h in headers])
+    new_headers, superseding = [], []
+    for h in headers:
+        found = existing.get((h["platform_number"], h["cycle_number"]))
+        if found is None:
+            new_headers.append(h)
+        elif data_mode_rank(h["data_mode"]) > data_mode_rank(found[1]):
+            superseding.append((h, found[0]))
+    skipped = len(headers) - len(new_headers) - len(superseding)
+    if skipped:
+        logger.info(f"➡️ {skipped} profiles in {file_source} already exist with the same or a higher data mode. Skipping them.")
+
+    failed_profiles = 0
+    for start in range(0, len(new_headers), batch_size):
+        batch = new_headers[start:start + batch_size]
+        try:
+            saved, failed = _save_batch(lambda b: save_profile_batch(b, columns), batch, file_source)
+        except Exception as e:
+            logger.error(f"❌ Error saving {len(batch)} profiles from {file_source}: {e}", exc_info=True)
+            failed_profiles += len(batch)
+            continue
+        failed_profiles += failed
+        total_measurements_saved += saved
+        logger.info(f"✅ Saved {len(batch) - failed} profiles ({saved} measurements) from {file_source}")
+
+    for start in range(0, len(superseding), batch_size):
+        batch = superseding[start:start + batch_size]
+        replace = lambda b: replace_profile_batch([h for h, _ in b], [pk for _, pk in b], columns)
+        try:
+            saved, failed = _save_batch(replace, batch, file_source)
+        except Exception as e:
+            logger.error(f"❌ Error replacing {len(batch)} profiles from {file_source}: {e}", exc_info=True)
+            failed_profiles += len(batch)
+            continue
+        failed_profiles += failed
+        total_measurements_saved += saved
+        logger.info(f"🔁 Replaced {len(batch) - failed} superseded profiles ({saved} measurements) from {file_source}")
+
+    if failed_profiles:
+        raise PartialIngestionError(
+            f"{failed_profiles} of {len(new_headers) + len(superseding)} new or superseding profiles in {file_source} could not be saved",
+            total_measurements_saved,
+        )
+    return total_measurements_saved
+
+def _save_payloads(payloads, file_source, batch_size=None, on_file_done=None):
+    """
+    Saves the decoded payloads of one file (a whole-file payload or its N_PROF slices) on this
+    (writer) process, and reports the outcome to on_file_done if given.
+    Returns: measurements saved
+    """
+    profile_count, saved, error = 0, 0, None
+    try:
+        for payload in payloads:
+            profile_count += len(payload["headers"])
+            try:
+                saved += save_decoded_file(payload, batch_size)
+            except PartialIngestionError as e:
+                logger.error(f"❌ {e}")
+                saved, error = saved + e.saved, e
+    except Exception as e:
+        logger.error(f"❌ Failed to parse and save {file_source}: {e}", exc_info=True)
+        error = e
+    if on_file_done:
+        on_file_done(file_source, profile_count, saved, error)
+    return saved
+
+def _future_payloads(future):
+    """Yields the payload of a decode future from the process pool."""
+    yield future.result()
+
+def process_single_netcdf_file(file_content, file_source, batch_size=None):
+    """
+    Processes a single NetCDF file (bytes from a URL, or a path on disk) and saves data to
+    Django DB. The file is decoded and saved in N_PROF slices.
     Returns: total_measurements_saved
     """
     logger.info(f"📂 Parsing file: {file_source}")
+    return _save_payloads(iter_decoded_slices(file_content, file_source), file_source, batch_size)
 
-    # No need for measurements_to_create list outside the loop since we bulk_create per profile
+def ingest_file_contents(files, workers=None, batch_size=None, on_file_done=None):
+    """
+    Parses and saves an iterable of (file_source, file_content) pairs, where file_content is
+    the file's bytes or its path on disk.
+    With workers > 1, NetCDF decoding runs in a process pool of that size while this
+    process stays the single DB writer; otherwise files are processed in-process.
+    on_file_done(file_source, profile_count, measurements_saved, error) is called after each file.
+    Returns: total_measurements_saved
+    """
+    workers = workers if workers is not None else getattr(settings, "ARGO_DECODE_WORKERS", 0)
     total_measurements_saved = 0
-    
+
+    if workers <= 1:
+        for file_source, file_content in files:
+            logger.info(f"📂 Parsing file: {file_source}")
+            payloads = iter_decoded_slices(file_content, file_source)
+            total_measurements_saved += _save_payloads(payloads, file_source, batch_size, on_file_done)
+        return total_measurements_saved
+
+    pending = deque()
+    # Workers must not fork this process: it holds open DB connections and, for URL
+    # sources, download threads. django.setup lets the fresh workers import the models.
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context(start_method), initializer=django.setup
+    ) as pool:
+        for file_source, file_content in files:
+            logger.info(f"📂 Parsing file: {file_source}")
+            pending.append((pool.submit(decode_netcdf_file, file_content, file_source), file_source))
+
+            # Write finished payloads in order; cap in-flight files so memory stays bounded
+            while pending and (len(pending) >= 2 * workers or pending[0][0].done()):
+                future, source = pending.popleft()
+                total_measurements_saved += _save_payloads(_future_payloads(future), source, batch_size, on_file_done)
+
+        while pending:
+            future, source = pending.popleft()
+            total_measurements_saved += _save_payloads(_future_payloads(future), source, batch_size, on_file_done)
+
+    return total_measurements_saved
+
+# --- CONCURRENT DOWNLOAD PIPELINE ---
+
+_DOWNLOADS_DONE = object()  # Sentinel each download worker puts on the queue when it exits
+
+def build_http_session(pool_size):
+    """Creates a requests Session whose keep-alive connection pool fits pool_size concurrent workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def download_file(url, session=None, retries=3, backoff=2, headers=None):
+    """
+    Downloads a file with the same retry/backoff logic as list_links.
+    Returns the response (status 304 if conditional headers matched) or None on failure.
+    """
+    http = session or requests
+    for attempt in range(retries):
+        try:
+            resp = http.get(url, timeout=60, headers=headers)
+            resp.raise_for_status()
+            return resp
+        except requests.exceptions.RequestException as e:
+            wait = backoff * (2 ** attempt) + random.random()
+            logger.warning(f"⚠️ Error downloading {url} (attempt {attempt+1}/{retries}): {e}. Retrying in {wait:.1f}s...")
+            time.sleep(wait)
+    logger.error(f"❌ Failed to download {url} after {retries} retries.")
+    return None
+
+def iter_downloads(urls, concurrency=None, queue_size=None, headers_for=None):
+    """
+    Downloads urls with a pool of concurrent workers sharing one keep-alive session and
+    yields (url, response) pairs from a bounded queue as downloads complete.
+    A download that failed after all its retries is yielded as (url, None).
+    The bounded queue keeps downloaders at most queue_size files ahead of the consumer.
+    headers_for(url), if given, returns extra request headers (e.g. conditional ones).
+    """
+    concurrency = max(1, concurrency or getattr(settings, "ARGO_DOWNLOAD_CONCURRENCY", 8))
+    queue_size = max(1, queue_size or getattr(settings, "ARGO_DOWNLOAD_QUEUE_SIZE", 2 * concurrency))
+
+    results = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    url_iter = iter(urls)
+    url_lock = threading.Lock()
+    session = build_http_session(concurrency)
+
+    def put(item):
+        # Never block forever: the consumer may stop early and never drain the queue
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def worker():
+        try:
+            while not stop.is_set():
+                with url_lock:
+                    url = next(url_iter, None)
+                if url is None:
+                    return
+                headers = headers_for(url) if headers_for else None
+                put((url, download_file(url, session=session, headers=headers)))
+        except Exception as e:
+            logger.error(f"❌ Download worker stopped: {e}", exc_info=True)
+        finally:
+            put(_DOWNLOADS_DONE)
+
+    threads = [
+        threading.Thread(target=worker, name=f"argo-download-{n}", daemon=True)
+        for n in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+
+    finished = 0
     try:
-        # Use io.BytesIO to read content from memory
-        with xr.open_dataset(io.BytesIO(file_content), decode_timedelta=False) as ds:
-            
-            # Determine profile count (safe default to 1 if N_PROF is not a dimension)
-            n_profiles = ds.sizes.get("N_PROF", 1) if 'N_PROF' in ds.sizes else 1
-            
-            for i in range(n_profiles):
-                try:
-                    # 1. EXTRACT PROFILE METADATA & CHECK EXISTENCE
-                    # Decode bytes for PLATFORM_NUMBER and DATA_MODE
-                    platform_number_raw = safe_index(ds["PLATFORM_NUMBER"], i)
-                    platform_number = decode_bytes(platform_number_raw) if platform_number_raw is not None else None
-                    cycle_number_raw = safe_index(ds["CYCLE_NUMBER"], i)
-                    cycle_number = int(cycle_number_raw) if cycle_number_raw is not None and not np.isnan(float(cycle_number_raw)) else -999 # Use sentinel
-                    
-                    if platform_number is None or platform_number == "" or cycle_number == -999:
-                         logger.error(f"❌ Skipping profile {i+1} in {file_source}: Missing PLATFORM_NUMBER or CYCLE_NUMBER.")
-                         continue
-                         
-                    composite_key = f"{platform_number}-{cycle_number}"
-
-                    if ArgoProfileData.objects.filter(platform_number=platform_number, cycle_number=cycle_number).exists():
-                        logger.info(f"➡️ Profile {composite_key} already exists. Skipping.")
-                        continue
-                    
-                    # 2. Prepare Profile Data for Django DB
-                    lat = float(safe_index(ds["LATITUDE"], i))
-                    lon = float(safe_index(ds["LONGITUDE"], i))
-                    ocean_name = get_nearest_ocean(lat, lon)
-                    juld_date = julian_to_datetime(safe_index(ds["JULD"], i))
-                    
-                    data_mode_raw = safe_index(ds["DATA_MODE"], i)
-                    data_mode = decode_bytes(data_mode_raw) if data_mode_raw is not None else "R" # Default to Real-Time
-
-                    # Get data arrays robustly
-                    pres_arr = get_array_or_default(ds, "PRES", i)
-                    temp_arr = get_array_or_default(ds, "TEMP", i)
-                    temp_adj_arr = get_array_or_default(ds, "TEMP_ADJUSTED", i)
-                    sal_arr = get_array_or_default(ds, "PSAL", i)
-                    sal_adj_arr = get_array_or_default(ds, "PSAL_ADJUSTED", i)
-
-                    # Get QC flags robustly (ensure these are byte arrays or string arrays for decoding)
-                    pres_qc_arr = get_array_or_default(ds, "PRES_QC", i, is_qc_flag=True)
-                    temp_qc_arr = get_array_or_default(ds, "TEMP_QC", i, is_qc_flag=True)
-                    psal_qc_arr = get_array_or_default(ds, "PSAL_QC", i, is_qc_flag=True)
-                    
-                    # 3. Save Profile to Django DB
-                    with transaction.atomic():
-                        profile_obj = ArgoProfileData.objects.create(
-                            platform_number=platform_number,
-                            cycle_number=cycle_number,
-                            juld_date=juld_date,
-                            latitude=lat,
-                            longitude=lon,
-                            ocean_name=ocean_name, 
-                            data_mode=data_mode,
-                            data_centre_ref=composite_key # Use the composite key for unique reference
-                        )
-                        
-                        # 4. Extract and Flatten Measurements for Django DB
-                        current_measurements = []
-                        # The length of all arrays should be the same here (due to get_array_or_default logic)
-                        for level in range(len(pres_arr)):
-                            # Only save measurement if pressure is a valid (non-NaN) value
-                            if not np.isnan(pres_arr[level]):
-                                
-                                # Use decode_bytes on QC flags before assignment
-                                pres_qc = decode_bytes(pres_qc_arr[level])
-                                temp_qc = decode_bytes(temp_qc_arr[level])
-                                psal_qc = decode_bytes(psal_qc_arr[level])
-                                
-                                # Set data values to None if NaN
-                                temp_val = float(temp_arr[level]) if not np.isnan(temp_arr[level]) else None
-                                temp_adj_val = float(temp_adj_arr[level]) if not np.isnan(temp_adj_arr[level]) else None
-                                sal_val = float(sal_arr[level]) if not np.isnan(sal_arr[level]) else None
-                                sal_adj_val = float(sal_adj_arr[level]) if not np.isnan(sal_adj_arr[level]) else None
-
-                                current_measurements.append(
-                                    ArgoMeasurement(
-                                        profile=profile_obj,
-                                        pressure=float(pres_arr[level]),
-                                        temperature=temp_val,
-                                        temperature_adjusted=temp_adj_val,
-                                        salinity=sal_val,
-                                        salinity_adjusted=sal_adj_val,
-                                        pres_qc=pres_qc,
-                                        temp_qc=temp_qc,
-                                        psal_qc=psal_qc,
-                                    )
-                                )
-                        
-                        if current_measurements:
-                            # Use batch size for very large profiles to prevent a single huge transaction
-                            ArgoMeasurement.objects.bulk_create(current_measurements, batch_size=5000)
-                            total_measurements_saved += len(current_measurements)
-                            logger.info(f"✅ Saved {len(current_measurements)} measurements for profile {composite_key}")
-
-                except Exception as e:
-                    logger.error(f"❌ Error processing profile {i+1} in {file_source}: {e}", exc_info=True)
-                    # Continue to next profile in multi-profile file
-                    continue
-            
-            return total_measurements_saved
+        while finished < concurrency:
+            item = results.get()
+            if item is _DOWNLOADS_DONE:
+                finished += 1
+                continue
+            yield item
+    finally:
+        stop.set()
+        session.close()
 
-    except Exception as e:
-        logger.error(f"❌ Failed to parse and save {file_source}: {e}", exc_info=True)
-        return 0
+# --- INGESTION MANIFEST ---
+
+def load_manifest(url_prefix):
+    """Loads the manifest rows of every source file under url_prefix, keyed by URL."""
+    return {entry.url: entry for entry in ArgoSourceFile.objects.filter(url__startswith=url_prefix)}
+
+def manifest_request_headers(entry):
+    """Conditional request headers for a file already ingested completely, so unchanged files answer 304."""
+    headers = {}
+    if entry is not None and entry.status == ArgoSourceFile.STATUS_COMPLETE:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+def skip_unchanged_files(downloads, manifest, on_download_failed=None):
+    """
+    Filters (url, response) downloads against the manifest, yielding (url, content) only for
+    files that are new, changed or not yet completely ingested. Every yielded file is
+    recorded as pending with its size, validators and content hash.
+    Failed downloads (response None) are passed to on_download_failed(url) instead.
+    """
+    for url, resp in downloads:
+        entry = manifest.get(url)
+        if resp is None:
+            if on_download_failed:
+                on_download_failed(url)
+            continue
+        if resp.status_code == 304:
+            logger.info(f"➡️ {url} not modified since last ingestion. Skipping.")
+            continue
 
-# --- REMAINING FUNCTIONS (Unchanged, as they were correct) ---
+        content = resp.content
+        validators = {
+            "size": len(content),
+            "etag": resp.headers.get("ETag", ""),
+            "last_modified": resp.headers.get("Last-Modified", ""),
+            "content_hash": hashlib.sha256(content).hexdigest(),
+        }
+        if entry and entry.status == ArgoSourceFile.STATUS_COMPLETE and entry.content_hash == validators["content_hash"]:
+            logger.info(f"➡️ {url} content unchanged since last ingestion. Skipping.")
+            ArgoSourceFile.objects.filter(pk=entry.pk).update(**validators)
+            continue
 
-def coordinate_argo_ingestion(base_url):
+        manifest[url], _ = ArgoSourceFile.objects.update_or_create(
+            url=url, defaults={**validators, "status": ArgoSourceFile.STATUS_PENDING, "error": ""}
+        )
+        yield url, content
+
+def record_file_outcome(url, profile_count, measurements_saved, error):
+    """
+    Marks a manifest entry complete or failed once its file has been processed. Files that
+    could not be downloaded have no entry yet and get a failed one.
+    """
+    ArgoSourceFile.objects.update_or_create(url=url, defaults={
+        "status": ArgoSourceFile.STATUS_FAILED if error else ArgoSourceFile.STATUS_COMPLETE,
+        "profile_count": profile_count,
+        "measurement_count": measurements_saved,
+        "error": str(error) if error else "",
+    })
+
+# --- INGESTION ENTRY POINTS ---
+
+def _until_stopped(files, should_stop):
+    """Passes files through until should_stop() returns True."""
+    for item in files:
+        if should_stop():
+            logger.info("⏹️ Ingestion stopped on request.")
+            return
+        yield item
+
+def coordinate_argo_ingestion(base_url, concurrency=None, workers=None, batch_size=None, on_file_done=None, should_stop=None):
     """
     Coordinates the ingestion from a URL (single file or directory crawl).
-    Handles downloading and Django DB save.
+    Files are downloaded by a bounded pool of concurrent workers, decoded in-process or
+    in a pool of `workers` processes, and saved to the Django DB by this thread,
+    batch_size profiles per transaction.
+    Files recorded as complete in the ArgoSourceFile manifest are revalidated with a
+    conditional GET and skipped when unchanged, so an interrupted crawl resumes where it stopped.
+    on_file_done(file_source, profile_count, measurements_saved, error) reports progress per file;
+    the crawl and the ingestion stop early once should_stop() returns True.
     """
-    ingested_measurements = 0
+    should_stop = should_stop or (lambda: False)
     nc_urls_to_process = []
 
     if base_url.endswith(".nc"):
         nc_urls_to_process.append(base_url)
     elif base_url.endswith("/"):
         try:
-            for url in recursive_nc_files(base_url, limit=None):
+            for url in _until_stopped(recursive_nc_files(base_url, limit=None), should_stop):
                  nc_urls_to_process.append(url)
         except Exception as e:
             logger.error(f"Failed to crawl directory {base_url}: {e}")
@@ -401,34 +1387,149 @@ def coordinate_argo_ingestion(base_url):
         logger.error(f"Invalid or unsupported URL format: {base_url}")
         return 0
 
-    
-    for url in nc_urls_to_process:
-        if "_prof.nc" in url or "/profiles/" in url:
-            try:
-                # 1. Download file content
-                response = requests.get(url, timeout=60)
-                response.raise_for_status()
-                file_content = response.content
-            except requests.exceptions.RequestException as e:
-                logger.error(f"❌ Failed to download {url}: {e}")
-                continue
-            
-            # 2. Process and save to Django DB
-            measurements_saved = process_single_netcdf_file(file_content, url)
-            ingested_measurements += measurements_saved
-            
-    return ingested_measurements
+    profile_urls = [url for url in nc_urls_to_process if "_prof.nc" in url or "/profiles/" in url]
+
+    manifest = load_manifest(base_url)
+
+    # Downloads run in worker threads; manifest and data writes stay on this thread
+    downloads = iter_downloads(
+        profile_urls, concurrency=concurrency,
+        headers_for=lambda url: manifest_request_headers(manifest.get(url)),
+    )
+    def file_done(file_source, profile_count, measurements_saved, error):
+        record_file_outcome(file_source, profile_count, measurements_saved, error)
+        if on_file_done:
+            on_file_done(file_source, profile_count, measurements_saved, error)
+
+    def download_failed(url):
+        file_done(url, 0, 0, "download failed")
+
+    files = _until_stopped(skip_unchanged_files(downloads, manifest, download_failed), should_stop)
+    return ingest_file_contents(files, workers=workers, batch_size=batch_size, on_file_done=file_done)
     
 def process_uploaded_netcdf_file(uploaded_file):
     """
     Processes an uploaded .nc file from Django (request.FILES["file"]).
+    The upload is opened from disk (spooled there in chunks if Django kept it in memory)
+    and decoded in N_PROF slices, so memory use does not grow with the file size.
     Saves data to Django DB.
     """
-    uploaded_file.seek(0)
-    file_content = uploaded_file.read()
     file_source = f"Uploaded File: {uploaded_file.name}"
-    
-    # Process and save to Django DB
-    measurements_saved = process_single_netcdf_file(file_content, file_source)
-            
-    return measurements_saved
\ No newline at end of file
+
+    # Large uploads are already on disk (TemporaryUploadedFile)
+    if hasattr(uploaded_file, "temporary_file_path"):
+        return process_single_netcdf_file(uploaded_file.temporary_file_path(), file_source)
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".nc", delete=False)
+    try:
+        with tmp:
+            for chunk in uploaded_file.chunks():
+                tmp.write(chunk)
+        # Process and save to Django DB
+        return process_single_netcdf_file(tmp.name, file_source)
+    finally:
+        os.remove(tmp.name)
+
+
+# --- BACKGROUND INGESTION JOBS ---
+
+MAX_JOB_ERROR_LINES = 50
+
+def enqueue_ingestion_job(argo_url):
+    """Queues a URL ingestion for the run_ingestion_worker command and returns the IngestionJob."""
+    job = IngestionJob.objects.create(source_url=argo_url)
+    logger.info(f"🗂️ Queued ingestion job {job.pk} for {argo_url}")
+    return job
+
+def claim_next_job():
+    """
+    Claims the oldest queued job for this worker, or returns None. The claim is a conditional
+    UPDATE, so two workers polling the same queue can never both start a job.
+    """
+    for job in IngestionJob.objects.filter(status=IngestionJob.STATUS_QUEUED).order_by("created_at")[:10]:
+        claimed = IngestionJob.objects.filter(pk=job.pk, status=IngestionJob.STATUS_QUEUED).update(
+            status=IngestionJob.STATUS_RUNNING, started_at=django_timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+def request_job_cancellation(job):
+    """Cancels a queued job immediately, or asks a running one to stop after its current file."""
+    if job.status == IngestionJob.STATUS_QUEUED:
+        IngestionJob.objects.filter(pk=job.pk, status=IngestionJob.STATUS_QUEUED).update(
+            status=IngestionJob.STATUS_CANCELLED, cancel_requested=True, finished_at=django_timezone.now()
+        )
+    elif job.status == IngestionJob.STATUS_RUNNING:
+        IngestionJob.objects.filter(pk=job.pk).update(cancel_requested=True)
+    job.refresh_from_db()
+    return job
+
+def run_ingestion_job(job, concurrency=None, workers=None):
+    """Runs a claimed job through coordinate_argo_ingestion, saving its progress after every file."""
+    errors = [line for line in job.errors.splitlines() if line]
+    progress = {"files_done": 0, "files_failed": 0, "profiles_done": 0, "measurements_done": 0}
+
+    def on_file_done(file_source, profile_count, measurements_saved, error):
+        progress["files_done"] += 1
+        progress["profiles_done"] += profile_count
+        progress["measurements_done"] += measurements_saved
+        if error:
+            progress["files_failed"] += 1
+            errors.append(f"{file_source}: {error}")
+        IngestionJob.objects.filter(pk=job.pk).update(errors="\n".join(errors[-MAX_JOB_ERROR_LINES:]), **progress)
+
+    def should_stop():
+        return IngestionJob.objects.filter(pk=job.pk, cancel_requested=True).exists()
+
+    logger.info(f"Starting ingestion job {job.pk} for URL: {job.source_url}")
+    try:
+        total_saved = coordinate_argo_ingestion(
+            job.source_url, concurrency=concurrency, workers=workers,
+            on_file_done=on_file_done, should_stop=should_stop,
+        )
+    except BaseException as e:
+        # Includes KeyboardInterrupt/SystemExit so a stopped worker never leaves a job "running"
+        logger.exception(f"Ingestion job {job.pk} failed")
+        errors.append(f"Job failed: {e!r}")
+        IngestionJob.objects.filter(pk=job.pk).update(
+            status=IngestionJob.STATUS_FAILED, finished_at=django_timezone.now(),
+            errors="\n".join(errors[-MAX_JOB_ERROR_LINES:]),
+        )
+        raise
+
+    if should_stop():
+        status = IngestionJob.STATUS_CANCELLED
+    elif progress["files_done"] and progress["files_failed"] == progress["files_done"]:
+        # Every file failed (e.g. the server was unreachable): nothing was ingested
+        status = IngestionJob.STATUS_FAILED
+    else:
+        status = IngestionJob.STATUS_COMPLETED
+    IngestionJob.objects.filter(pk=job.pk).update(status=status, finished_at=django_timezone.now())
+    logger.info(f"Ingestion job {job.pk} {status}. Saved {total_saved} records.")
+    job.refresh_from_db()
+    return job
+
+def job_status(job):
+    """JSON-ready progress report for a job, including its measurement rate."""
+    rows_per_second = None
+    if job.started_at:
+        elapsed = ((job.finished_at or django_timezone.now()) - job.started_at).total_seconds()
+        rows_per_second = round(job.measurements_done / elapsed, 1) if elapsed > 0 else 0.0
+
+    return {
+        "job_id": job.pk,
+        "source_url": job.source_url,
+        "status": job.status,
+        "cancel_requested": job.cancel_requested,
+        "files_done": job.files_done,
+        "files_failed": job.files_failed,
+        "profiles_done": job.profiles_done,
+        "measurements_done": job.measurements_done,
+        "rows_per_second": rows_per_second,
+        "errors": [line for line in job.errors.splitlines() if line],
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
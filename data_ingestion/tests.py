@@ -1,3 +1,209 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import numpy as np
+from datetime import datetime, timezone
+from unittest import mock
+from django.test import SimpleTestCase, TestCase
 
-# Create your tests here.
+from . import archive, services
+from .models import (
+    ArgoMeasurement, ArgoProfileData, ArgoProfileSummary, ArgoSourceFile, ArgoStandardLevel, DataGeneration,
+    IngestionJob,
+)
+
+
+def profile_batch(pressures_per_profile, platform_number="2902746", longitude=80.5):
+    """Headers and flat level columns shaped like a decoded file, one profile per pressure list."""
+    headers = [
+        {
+            "index": i, "platform_number": platform_number, "cycle_number": i + 1,
+            "juld_date": datetime(2020, 1, 1, tzinfo=timezone.utc), "latitude": 10.5, "longitude": longitude,
+            "ocean_name": "Indian Ocean", "data_mode": "R",
+        }
+        for i in range(len(pressures_per_profile))
+    ]
+    pressure = np.concatenate([np.asarray(p, dtype=float) for p in pressures_per_profile])
+    columns = {"profile_index": np.repeat(np.arange(len(pressures_per_profile)), [len(p) for p in pressures_per_profile])}
+    for variable in services.LEVEL_VARIABLES:
+        columns[variable] = np.linspace(1, 2, len(pressure))
+    columns["pressure"] = pressure
+    for variable in services.QC_VARIABLES:
+        columns[variable] = np.full(len(pressure), "1")
+    return headers, columns
+
+
+class SaveProfileBatchTests(TestCase):
+    # Ingestion writes go through the "ingest" alias, reads through "default"
+    databases = {"default", "ingest"}
+
+    def test_saves_profiles_levels_and_summaries(self):
+        generation = DataGeneration.current()
+        saved = services.save_profile_batch(*profile_batch([[5, 10, 20], [5, 10]]))
+
+        self.assertEqual(saved, 5)
+        self.assertEqual(ArgoProfileData.objects.count(), 2)
+        self.assertEqual(ArgoMeasurement.objects.count(), 5)
+        self.assertEqual(
+            sorted(ArgoProfileSummary.objects.values_list("n_levels", flat=True)), [2, 3]
+        )
+        self.assertGreater(DataGeneration.current(), generation)
+
+    def test_bad_profile_does_not_roll_back_its_batch(self):
+        headers, columns = profile_batch([[5, 10], [5, 10, 20], [5]])
+        # The same profile twice in one file violates the (platform_number, cycle_number) key
+        headers[2]["cycle_number"] = headers[1]["cycle_number"]
+        payload = {"source": "dup.nc", "headers": headers, "columns": columns}
+
+        with self.assertRaises(services.PartialIngestionError) as raised:
+            services.save_decoded_file(payload, batch_size=10)
+
+        self.assertEqual(raised.exception.saved, 5)
+        self.assertEqual(ArgoProfileData.objects.count(), 2)
+
+
+
+class DataModePrecedenceTests(TestCase):
+    databases = {"default", "ingest"}
+
+    def ingest(self, data_mode, pressures, temperature):
+        headers, columns = profile_batch([pressures])
+        headers[0]["data_mode"] = data_mode
+        columns["temperature"] = np.full(len(pressures), temperature)
+        services.save_decoded_file({"source": f"{data_mode}.nc", "headers": headers, "columns": columns})
+
+    def stored(self):
+        profile = ArgoProfileData.objects.get()
+        return (
+            profile.pk,
+            profile.data_mode,
+            list(ArgoMeasurement.objects.order_by("pressure").values_list("pressure", "temperature")),
+            ArgoProfileSummary.objects.values_list("n_levels", "temperature_mean").get(),
+            list(ArgoStandardLevel.objects.order_by("pressure").values_list("pressure", "temperature")),
+        )
+
+    def test_delayed_mode_replaces_real_time_profile_in_place(self):
+        self.ingest("R", [5, 10, 20], 20.0)
+        pk = ArgoProfileData.objects.get().pk
+
+        self.ingest("D", [5, 10], 25.0)
+
+        self.assertEqual(self.stored(), (
+            pk, "D", [(5.0, 25.0), (10.0, 25.0)], (2, 25.0), [(5.0, 25.0), (10.0, 25.0)],
+        ))
+
+    def test_lower_or_same_data_mode_changes_nothing(self):
+        self.ingest("R", [5, 10, 20], 20.0)
+        self.ingest("D", [5, 10], 25.0)
+        before = self.stored()
+        generation = DataGeneration.current()
+
+        self.ingest("A", [5], 30.0)
+        self.ingest("D", [5, 10, 20], 30.0)
+
+        self.assertEqual(self.stored(), before)
+        self.assertEqual(DataGeneration.current(), generation)
+
+    def test_replacing_exported_profiles_makes_the_archive_stale(self):
+        self.ingest("R", [5, 10, 20], 20.0)
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, archive.STATE_FILE), "w") as f:
+                json.dump({"last_profile_id": 1, "profiles": 1, "rows": 3,
+                           "profile_edits": DataGeneration.current(DataGeneration.PROFILE_EDITS)}, f)
+            self.assertFalse(archive.archive_is_stale(root))
+
+            self.ingest("D", [5, 10], 25.0)
+
+            self.assertTrue(archive.archive_is_stale(root))
+
+
+class FlattenLevelArraysTests(SimpleTestCase):
+    def test_repeated_pressure_keeps_first_level(self):
+        levels = {field: np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]) for field in services.LEVEL_VARIABLES}
+        levels["pressure"] = np.array([[5.0, 5.0, 10.0], [5.0, np.nan, 10.0]])
+        for field in services.QC_VARIABLES:
+            levels[field] = np.full((2, 3), "1")
+
+        columns = services.flatten_level_arrays(levels)
+
+        self.assertEqual(columns["profile_index"].tolist(), [0, 0, 1, 1])
+        self.assertEqual(columns["pressure"].tolist(), [5.0, 10.0, 5.0, 10.0])
+        self.assertEqual(columns["temperature"].tolist(), [1.0, 3.0, 4.0, 6.0])
+
+
+
+
+class OceanLookupTests(SimpleTestCase):
+    def test_nearest_ocean(self):
+        self.assertEqual(services.get_nearest_ocean(14.0, 66.0), "Arabian Sea")
+        self.assertEqual(services.get_nearest_ocean(-22.0, 79.0), "Indian Ocean")
+        self.assertEqual(services.get_nearest_ocean(float("nan"), 80.0), "Unknown")
+
+    def test_lookup_grid_matches_exact_classifier_away_from_boundaries(self):
+        lats, lons = [14.0, -22.0, 15.2, 59.0, float("nan")], [66.0, 79.0, 89.7, 179.5, 0.0]
+        self.assertEqual(
+            services.classify_oceans(lats, lons, resolution=0.5).tolist(),
+            ["Arabian Sea", "Indian Ocean", "Bay of Bengal", "Bering Sea", "Unknown"],
+        )
+        self.assertEqual(
+            services.classify_oceans(lats, lons, resolution=0).tolist(),
+            services.classify_oceans(lats, lons, resolution=0.5).tolist(),
+        )
+
+
+class JuldDecoderTests(SimpleTestCase):
+    def test_days_since_1950_and_epoch_values(self):
+        decoded = services.julian_to_datetime64([
+            0.0, 25567.5,            # days since 1950-01-01
+            1.5778368e18,            # ns since the UNIX epoch
+            1.5778368e15,            # us
+            1.5778368e12,            # ms
+        ])
+        self.assertEqual(decoded.astype(str).tolist(), [
+            "1950-01-01T00:00:00.000000000", "2020-01-01T12:00:00.000000000",
+            "2020-01-01T00:00:00.000000000", "2020-01-01T00:00:00.000000000", "2020-01-01T00:00:00.000000000",
+        ])
+
+    def test_fill_out_of_range_and_text_values_become_nat(self):
+        # 999999 is the Argo fill value; 1e16 us since the epoch is past 2262 (datetime64[ns])
+        for values in ([999999.0, np.nan, 1e16], ["abc", ""], [b"abc"]):
+            with self.subTest(values=values):
+                self.assertTrue(np.isnat(services.julian_to_datetime64(values)).all())
+
+    def test_text_values_are_decoded_one_by_one(self):
+        decoded = services.julian_to_datetime64(np.array(["abc", "25567.5"]))
+        self.assertEqual(decoded.astype(str).tolist(), ["NaT", "2020-01-01T12:00:00.000000000"])
+
+    def test_scalar_wrapper(self):
+        self.assertEqual(services.julian_to_datetime(25567.5), datetime(2020, 1, 1, 12, tzinfo=timezone.utc))
+        self.assertEqual(services.julian_to_datetime(b"25567.5"), datetime(2020, 1, 1, 12, tzinfo=timezone.utc))
+        self.assertIsNone(services.julian_to_datetime("abc"))
+        self.assertIsNone(services.julian_to_datetime(None))
+
+
+class SpatialFilterTests(TestCase):
+    databases = {"default", "ingest"}
+
+    def test_box_ending_at_the_dateline_finds_longitude_180(self):
+        self.assertEqual(services.grid_cells([10.5], [180.0]).tolist(), [100 * 360 + 359])
+        services.save_profile_batch(*profile_batch([[5, 10]], longitude=180.0))
+
+        box = ArgoProfileData.objects.filter(services.bbox_q(10, 11, 175, 180))
+        self.assertEqual(box.count(), 1)
+
+
+class IngestionJobTests(TestCase):
+    databases = {"default", "ingest"}
+
+    @mock.patch.object(services.time, "sleep")
+    def test_unreachable_file_fails_the_job(self, sleep):
+        url = "http://127.0.0.1:9/x_prof.nc"
+        services.enqueue_ingestion_job(url)
+        job = services.claim_next_job()
+
+        job = services.run_ingestion_job(job, concurrency=1)
+
+        self.assertEqual(job.status, IngestionJob.STATUS_FAILED)
+        self.assertEqual((job.files_done, job.files_failed), (1, 1))
+        self.assertIn(url, job.errors)
+        self.assertEqual(ArgoSourceFile.objects.get(url=url).status, ArgoSourceFile.STATUS_FAILED)
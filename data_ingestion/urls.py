@@ -1,8 +1,10 @@
 # In argo_data/urls.py
 
 from django.urls import path
-from .views import ingest_argo_data_handler
+from .views import ingest_argo_data_handler, ingestion_job_status, cancel_ingestion_job
 
 urlpatterns = [
     path('ingest-url/', ingest_argo_data_handler, name='argo_ingestion_page'),
-]
\ No newline at end of file
+    path('jobs/<int:job_id>/', ingestion_job_status, name='argo_ingestion_job_status'),
+    path('jobs/<int:job_id>/cancel/', cancel_ingestion_job, name='argo_ingestion_job_cancel'),
+]
@@ -1,5 +1,6 @@
 from django.shortcuts import render
 from django.http import JsonResponse
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
@@ -7,26 +8,23 @@ import json
 import logging
 import traceback
 # Imports the functions that now handle geolocation and DB storage
-from .services import coordinate_argo_ingestion, process_uploaded_netcdf_file 
+from .models import IngestionJob
+from .services import (
+    enqueue_ingestion_job,
+    job_status,
+    process_uploaded_netcdf_file,
+    request_job_cancellation,
+)
 
 logger = logging.getLogger(__name__)
 
-# Mock Task (for URL ingestion)
-def argo_ingestion_task(argo_url):
-    """Delegates the ingestion task for a URL to the service layer."""
-    logger.info(f"Starting ingestion for URL: {argo_url}")
-    # The coordinate_argo_ingestion function now handles calling get_nearest_ocean
-    total_saved = coordinate_argo_ingestion(argo_url)
-    logger.info(f"Ingestion complete for {argo_url}. Saved {total_saved} records.")
-    return total_saved
-
 
 @csrf_exempt
 def ingest_argo_data_handler(request):
     """
     Handles both GET (renders the form) and POST (handles API submission).
     Supports:
-      - JSON POST with 'argo_url' → download from URL & ingest
+      - JSON POST with 'argo_url' → queue a background ingestion job (run by run_ingestion_worker)
       - multipart/form-data POST with 'file' → ingest uploaded .nc file
     """
     if request.method == 'GET':
@@ -67,14 +65,15 @@ def ingest_argo_data_handler(request):
                 except ValidationError:
                     return JsonResponse({"error": "The provided URL is not valid."}, status=400)
 
-                # Delegation to service function (which handles ocean name calculation)
-                total_records_saved = argo_ingestion_task(argo_url)
+                # Queue the crawl for the ingestion worker instead of running it in this request
+                job = enqueue_ingestion_job(argo_url)
 
                 return JsonResponse({
-                    "message": "Data ingestion completed. Ocean names have been stored.",
+                    "message": "Data ingestion queued.",
                     "url_processed": argo_url,
-                    "total_records_saved": total_records_saved,
-                }, status=200)
+                    "job_id": job.pk,
+                    "status_url": reverse('argo_ingestion_job_status', args=[job.pk]),
+                }, status=202)
 
             else:
                 return JsonResponse({"error": "Unsupported Content-Type. Use JSON or multipart/form-data."}, status=415)
@@ -87,3 +86,28 @@ def ingest_argo_data_handler(request):
 
     else:
         return JsonResponse({"error": "Method not allowed."}, status=405)
+
+
+def ingestion_job_status(request, job_id):
+    """GET: progress of a background ingestion job (files/profiles done, rows/sec, errors)."""
+    if request.method != 'GET':
+        return JsonResponse({"error": "Method not allowed."}, status=405)
+    try:
+        job = IngestionJob.objects.get(pk=job_id)
+    except IngestionJob.DoesNotExist:
+        return JsonResponse({"error": "Job not found."}, status=404)
+    return JsonResponse(job_status(job), status=200)
+
+
+@csrf_exempt
+def cancel_ingestion_job(request, job_id):
+    """POST: cancel a queued job, or stop a running one after its current file."""
+    if request.method != 'POST':
+        return JsonResponse({"error": "Method not allowed."}, status=405)
+    try:
+        job = IngestionJob.objects.get(pk=job_id)
+    except IngestionJob.DoesNotExist:
+        return JsonResponse({"error": "Job not found."}, status=404)
+    if job.status not in (IngestionJob.STATUS_QUEUED, IngestionJob.STATUS_RUNNING):
+        return JsonResponse({"error": f"Job is already {job.status}."}, status=409)
+    return JsonResponse(job_status(request_job_cancellation(job)), status=202)
@@ -0,0 +1,101 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from django.conf import settings
+from django.core.cache import caches
+
+# --- LOOKUP RESPONSE CACHE ---
+# Lookup pages cached under a key built from the normalized filters and the current
+# DataGeneration value. Ingestion bumps the generation in the same transaction that
+# commits new profiles, so entries of an older generation are simply never looked up again.
+
+
+class LookupCache:
+    """
+    In-process LRU of response payloads, optionally backed by a shared Django cache alias
+    (file or database cache) so several worker processes reuse each other's results.
+    """
+
+    def __init__(self, maxsize=None, shared_alias=None, timeout=None):
+        self.maxsize = maxsize if maxsize is not None else getattr(settings, "ARGO_LOOKUP_CACHE_SIZE", 256)
+        self.shared_alias = shared_alias if shared_alias is not None else getattr(settings, "ARGO_LOOKUP_CACHE_ALIAS", "")
+        self.timeout = timeout if timeout is not None else getattr(settings, "ARGO_LOOKUP_CACHE_TIMEOUT", 3600)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 or bool(self.shared_alias)
+
+    def key(self, params, generation, extra=None):
+        """Cache key of a normalized filter set at one data generation."""
+        normalized = {
+            k: (v.isoformat() if isinstance(v, datetime) else v)
+            for k, v in sorted(params.items())
+        }
+        if normalized.get("ocean_name"):
+            # ocean_name is matched case-insensitively
+            normalized["ocean_name"] = normalized["ocean_name"].lower()
+        blob = json.dumps([normalized, generation, extra], sort_keys=True, default=str)
+        return "argo-lookup:" + hashlib.sha256(blob.encode()).hexdigest()
+
+    def get(self, key, generation):
+        with self._lock:
+            if generation != self._generation:
+                # Everything cached locally belongs to an older generation
+                self._entries.clear()
+                self._generation = generation
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.shared_alias:
+            value = caches[self.shared_alias].get(key)
+            if value is not None:
+                self._store_local(key, value)
+                with self._lock:
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._store_local(key, value)
+        if self.shared_alias:
+            caches[self.shared_alias].set(key, value, self.timeout)
+
+    def _store_local(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "generation": self._generation,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else None,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "shared_backend": self.shared_alias or None,
+            }
+
+
+lookup_cache = LookupCache()
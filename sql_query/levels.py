@@ -0,0 +1,136 @@
+import io
+import json
+import numpy as np
+
+from data_ingestion.models import ArgoProfileData, ArgoProfileLevels
+from data_ingestion.services import read_level_columns
+
+# --- PROFILE LEVEL ENCODERS ---
+# Level vectors of several profiles in one columnar response. All formats carry the same
+# data: one header per profile (ordered by profile id) and, for each level field, the
+# concatenated levels of every profile; profile i owns levels offsets[i]:offsets[i + 1].
+
+HEADER_FIELDS = ["platform_number", "cycle_number", "juld_date", "latitude", "longitude", "data_mode"]
+LEVEL_FIELDS = ArgoProfileLevels.FLOAT_FIELDS + ArgoProfileLevels.QC_FIELDS
+
+
+def fetch_profile_levels(keys, fields=None):
+    """
+    Loads the levels of the (platform_number, cycle_number) keys with one header query and
+    one level query. Unknown keys are left out.
+    Returns: (headers, offsets, {field: array}) with floats as float32 (NaN when missing)
+    and QC flags as 'S1' bytes (b'' when missing)
+    """
+    fields = fields or LEVEL_FIELDS
+    wanted = set(keys)
+    headers = [
+        h for h in ArgoProfileData.objects.filter(
+            platform_number__in={platform for platform, _ in keys},
+            cycle_number__in={cycle for _, cycle in keys},
+        ).order_by("pk").values("pk", *HEADER_FIELDS)
+        if (h["platform_number"], h["cycle_number"]) in wanted
+    ]
+
+    profile_ids = np.array([h["pk"] for h in headers], dtype=np.int64)
+    level_ids, columns = read_level_columns(profile_ids.tolist())
+    # Levels come grouped by ascending profile id, like the headers
+    offsets = np.concatenate([
+        np.searchsorted(level_ids, profile_ids, side="left"),
+        [len(level_ids)],
+    ]).astype(np.int64)
+
+    levels = {}
+    for f in fields:
+        if f in ArgoProfileLevels.QC_FIELDS:
+            levels[f] = np.asarray(columns[f], dtype="S1")
+        else:
+            levels[f] = np.asarray(columns[f], dtype=np.float32)
+    return headers, offsets, levels
+
+
+def encode_npz(headers, offsets, levels):
+    """NumPy .npz archive: header arrays, offsets and one array per level field."""
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        platform_number=np.array([h["platform_number"] for h in headers], dtype=str),
+        cycle_number=np.array([h["cycle_number"] for h in headers], dtype=np.int32),
+        juld_date=np.array(
+            [h["juld_date"].replace(tzinfo=None) if h["juld_date"] else None for h in headers],
+            dtype="datetime64[s]",
+        ),
+        latitude=np.array([h["latitude"] for h in headers], dtype=np.float64),
+        longitude=np.array([h["longitude"] for h in headers], dtype=np.float64),
+        data_mode=np.array([h["data_mode"] or "" for h in headers], dtype=str),
+        offsets=offsets,
+        **levels,
+    )
+    return buffer.getvalue()
+
+
+def encode_arrow(headers, offsets, levels):
+    """
+    Arrow IPC stream with one row per profile: the header columns plus one list column per
+    level field, built on the level arrays without copying them per profile.
+    """
+    import pyarrow as pa
+
+    list_offsets = pa.array(offsets.astype(np.int32), type=pa.int32())
+    columns = {
+        "platform_number": pa.array([h["platform_number"] for h in headers], type=pa.string()),
+        "cycle_number": pa.array([h["cycle_number"] for h in headers], type=pa.int32()),
+        "juld_date": pa.array([h["juld_date"] for h in headers], type=pa.timestamp("us", tz="UTC")),
+        "latitude": pa.array([h["latitude"] for h in headers], type=pa.float64()),
+        "longitude": pa.array([h["longitude"] for h in headers], type=pa.float64()),
+        "data_mode": pa.array([h["data_mode"] for h in headers], type=pa.string()),
+    }
+    for f, values in levels.items():
+        if values.dtype.kind == "S":
+            # '' (missing flag) becomes null, like NaN for the float columns
+            flat = pa.array(values.astype(str), type=pa.string(), mask=values == b"")
+        else:
+            flat = pa.array(values, type=pa.float32(), from_pandas=True)
+        columns[f] = pa.ListArray.from_arrays(list_offsets, flat)
+
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_json(headers, offsets, levels):
+    """JSON fallback: one object per profile with a list per level field (null when missing)."""
+    lists = {}
+    for f, values in levels.items():
+        if values.dtype.kind == "S":
+            lists[f] = [flag.decode() or None for flag in values.tolist()]
+        else:
+            # float32 printed as float64 would show noise digits past the sensor precision
+            rounded = np.round(values.astype(np.float64), 4)
+            lists[f] = np.where(np.isnan(rounded), None, rounded.astype(object)).tolist()
+
+    profiles = []
+    for i, h in enumerate(headers):
+        start, end = offsets[i], offsets[i + 1]
+        profile = {
+            "platform_number": h["platform_number"],
+            "cycle_number": h["cycle_number"],
+            "date": h["juld_date"].strftime("%Y-%m-%d %H:%M:%S") if h["juld_date"] else None,
+            "latitude": h["latitude"],
+            "longitude": h["longitude"],
+            "data_mode": h["data_mode"],
+            "n_levels": int(end - start),
+        }
+        for f in levels:
+            profile[f] = lists[f][start:end]
+        profiles.append(profile)
+    return json.dumps({"count": len(profiles), "profiles": profiles})
+
+
+# format name: (encoder, content type)
+ENCODERS = {
+    "npz": (encode_npz, "application/octet-stream"),
+    "arrow": (encode_arrow, "application/vnd.apache.arrow.stream"),
+    "json": (encode_json, "application/json"),
+}
@@ -1,3 +1,184 @@
-from django.test import TestCase
+import io
+import json
+import numpy as np
+from datetime import datetime, timezone
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from unittest import skipUnless
 
-# Create your tests here.
+from data_ingestion.models import ArgoProfileData, ArgoProfileSummary, ArgoStandardLevel
+
+from .cache import LookupCache
+from .levels import encode_json, encode_npz
+from .views import encode_cursor, lookup_rows, parse_lookup_params
+
+PROFILE_TABLE = "data_ingestion_argoprofiledata"
+
+
+@skipUnless(connection.vendor == "sqlite", "query plans are asserted in SQLite's EXPLAIN QUERY PLAN format")
+class LookupQueryPlanTests(TestCase):
+    """
+    Every filter combination of the lookup endpoint must reach the profile table through an
+    index. A model or query change that brings back a full table scan fails here.
+    """
+
+    databases = {"default", "ingest"}
+
+    def plan(self, **data):
+        return lookup_rows(parse_lookup_params(data)).explain()
+
+    def assertUsesIndex(self, plan, index=None):
+        searches = [line for line in plan.splitlines() if f"SEARCH {PROFILE_TABLE} " in line]
+        scans = [line for line in plan.splitlines() if f"SCAN {PROFILE_TABLE}" in line]
+        self.assertTrue(searches, f"no index search on {PROFILE_TABLE}:\n{plan}")
+        self.assertFalse(scans, f"full scan of {PROFILE_TABLE}:\n{plan}")
+        if index:
+            self.assertIn(index, plan)
+
+    def test_latitude_range(self):
+        self.assertUsesIndex(self.plan(min_lat="-10", max_lat="10"), "argo_profile_lat_lon_idx")
+
+    def test_bounding_box(self):
+        self.assertUsesIndex(self.plan(min_lat="-10", max_lat="10", min_lon="20", max_lon="40"))
+
+    def test_bounding_box_across_dateline(self):
+        self.assertUsesIndex(self.plan(min_lat="-5", max_lat="5", min_lon="170", max_lon="-170"))
+
+    def test_radius(self):
+        self.assertUsesIndex(self.plan(center_lat="0", center_lon="80", radius_km="300"))
+
+    def test_ocean_name(self):
+        self.assertUsesIndex(self.plan(ocean_name="indian ocean"), "argo_profile_ocean_date_idx")
+
+    def test_ocean_name_and_dates(self):
+        plan = self.plan(ocean_name="Indian Ocean", start_date="2019-01-01", end_date="2019-06-30")
+        self.assertUsesIndex(plan, "argo_profile_ocean_date_idx")
+
+    def test_ocean_name_and_year(self):
+        self.assertUsesIndex(self.plan(ocean_name="Pacific Ocean", year="2020"), "argo_profile_ocean_date_idx")
+
+    def test_year(self):
+        self.assertUsesIndex(self.plan(year="2020"), "juld_date")
+
+    def test_date_range(self):
+        self.assertUsesIndex(self.plan(start_date="2019-01-01", end_date="2019-06-30"), "juld_date")
+
+    def test_latitude_and_year(self):
+        self.assertUsesIndex(self.plan(min_lat="0", max_lat="30", year="2020"))
+
+    def test_next_page_cursor(self):
+        data = {"cursor": encode_cursor({"platform_number": "1901820", "cycle_number": 12})}
+        self.assertUsesIndex(self.plan(**data), "platform_number_cycle_number")
+
+    @override_settings(ARGO_LEVEL_STORAGE="rows")
+    def test_pressure_range_and_qc_read_only_the_covering_index(self):
+        plan = self.plan(min_pres="0", max_pres="200", qc="1")
+        self.assertIn("USING COVERING INDEX argo_meas_pres_qc_cover_idx (profile_id=? AND pressure>? AND pressure<?)", plan)
+        self.assertNotIn("SCAN data_ingestion_argomeasurement", plan)
+
+
+class LookupCacheTests(SimpleTestCase):
+    def test_key_ignores_ocean_name_case(self):
+        cache = LookupCache(maxsize=4, shared_alias="")
+        upper = cache.key(parse_lookup_params({"ocean_name": "Indian Ocean"}), 1)
+        lower = cache.key(parse_lookup_params({"ocean_name": "indian ocean"}), 1)
+        self.assertEqual(upper, lower)
+
+    def test_new_generation_drops_entries(self):
+        cache = LookupCache(maxsize=4, shared_alias="")
+        params = parse_lookup_params({"min_lat": "-10", "max_lat": "10"})
+        key = cache.key(params, 1)
+        self.assertIsNone(cache.get(key, 1))
+        cache.put(key, {"count": 0})
+        self.assertEqual(cache.get(key, 1), {"count": 0})
+
+        self.assertNotEqual(cache.key(params, 2), key)
+        self.assertIsNone(cache.get(key, 2))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LookupCache(maxsize=2, shared_alias="")
+        cache.get("warm", 1)
+        for key in ("a", "b"):
+            cache.put(key, key)
+        cache.get("a", 1)
+        cache.put("c", "c")
+        self.assertIsNone(cache.get("b", 1))
+        self.assertEqual(cache.get("a", 1), "a")
+
+
+class ProfileLevelEncoderTests(SimpleTestCase):
+    headers = [
+        {"platform_number": "2902746", "cycle_number": cycle, "juld_date": datetime(2020, 1, cycle, tzinfo=timezone.utc),
+         "latitude": 1.5, "longitude": 80.25, "data_mode": "R"}
+        for cycle in (1, 2)
+    ]
+    offsets = np.array([0, 2, 3])
+    levels = {
+        "pressure": np.array([5, 10, 5], dtype=np.float32),
+        "temperature": np.array([28.5, np.nan, 27.25], dtype=np.float32),
+        "temp_qc": np.array([b"1", b"", b"4"], dtype="S1"),
+    }
+
+    def test_json_splits_levels_per_profile(self):
+        profiles = json.loads(encode_json(self.headers, self.offsets, self.levels))["profiles"]
+        self.assertEqual([p["n_levels"] for p in profiles], [2, 1])
+        self.assertEqual(profiles[0]["temperature"], [28.5, None])
+        self.assertEqual(profiles[0]["temp_qc"], ["1", None])
+        self.assertEqual(profiles[1]["pressure"], [5.0])
+
+    def test_npz_round_trip(self):
+        arrays = np.load(io.BytesIO(encode_npz(self.headers, self.offsets, self.levels)))
+        self.assertEqual(arrays["offsets"].tolist(), [0, 2, 3])
+        self.assertEqual(arrays["cycle_number"].tolist(), [1, 2])
+        np.testing.assert_array_equal(arrays["temperature"], self.levels["temperature"])
+        self.assertEqual(arrays["temp_qc"].tolist(), [b"1", b"", b"4"])
+
+
+class GridAggregateTests(TestCase):
+    databases = {"default", "ingest"}
+
+    @classmethod
+    def setUpTestData(cls):
+        samples = [
+            # latitude, longitude, month, mean temperature, temperature at 10 dbar
+            (1.0, 81.0, 1, 28.0, 27.0),
+            (4.0, 84.0, 1, 26.0, 25.0),
+            (4.0, 84.0, 2, 20.0, 19.0),
+            (-30.0, 90.0, 1, 15.0, 14.0),
+        ]
+        for cycle, (lat, lon, month, mean, at_10) in enumerate(samples):
+            profile = ArgoProfileData.objects.create(
+                platform_number="2902746", cycle_number=cycle, latitude=lat, longitude=lon,
+                juld_date=datetime(2020, month, 15, tzinfo=timezone.utc), ocean_name="Indian Ocean",
+            )
+            ArgoProfileSummary.objects.create(profile=profile, n_levels=2, temperature_mean=mean)
+            ArgoStandardLevel.objects.create(profile=profile, pressure=10, temperature=at_10)
+            ArgoStandardLevel.objects.create(profile=profile, pressure=500, temperature=at_10 - 20)
+
+    def cells(self, **params):
+        response = self.client.get("/sql-query/grid/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return {(c["lat_min"], c["lon_min"], c.get("period")): c for c in response.json()["cells"]}
+
+    def test_profile_means_per_cell(self):
+        cells = self.cells(resolution=5)
+        self.assertEqual(len(cells), 2)
+        cell = cells[(0.0, 80.0, None)]
+        self.assertEqual(cell["n_profiles"], 3)
+        self.assertAlmostEqual(cell["temperature_mean"], 74 / 3, places=3)
+        self.assertAlmostEqual(cell["temperature_std"], 3.3993, places=3)
+
+    def test_monthly_buckets(self):
+        cells = self.cells(resolution=5, period="month")
+        self.assertEqual(cells[(0.0, 80.0, "2020-01")]["temperature_mean"], 27.0)
+        self.assertEqual(cells[(0.0, 80.0, "2020-02")]["n_profiles"], 1)
+
+    def test_pressure_range_uses_standard_levels(self):
+        cells = self.cells(resolution=5, min_pres=0, max_pres=100)
+        cell = cells[(0.0, 80.0, None)]
+        self.assertEqual(cell["n_temperature"], 3)
+        self.assertAlmostEqual(cell["temperature_mean"], 71 / 3, places=3)
+
+    def test_invalid_resolution(self):
+        self.assertEqual(self.client.get("/sql-query/grid/", {"resolution": "0"}).status_code, 400)
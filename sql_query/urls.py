@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import sql_query_argo_data
+from .views import grid_aggregate, lookup_cache_stats, profile_levels, sql_query_argo_data
 
 urlpatterns = [
     path('lookup-table/', sql_query_argo_data, name='sql_lookup_table'),
+    path('profile-levels/', profile_levels, name='sql_profile_levels'),
+    path('grid/', grid_aggregate, name='sql_grid_aggregate'),
+    path('cache-stats/', lookup_cache_stats, name='sql_lookup_cache_stats'),
 ]
\ No newline at end of file
@@ -1,15 +1,375 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.db.models import Avg
+from django.conf import settings
+from django.db.models import Avg, Count, Exists, F, IntegerField, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import ExtractMonth, Floor, Least, Lower, TruncMonth, TruncYear
 import json
+import base64
 import logging
-from datetime import datetime
+from itertools import islice
+from datetime import datetime, timezone
 from django.shortcuts import render
 
-from data_ingestion.models import ArgoProfileData, ArgoMeasurement
+from data_ingestion.models import ArgoMeasurement, ArgoProfileData, ArgoStandardLevel, DataGeneration
+from data_ingestion.archive import ArchiveUnavailable, profile_means, read_export_state
+from .cache import lookup_cache
+from .levels import ENCODERS, LEVEL_FIELDS, fetch_profile_levels
+from data_ingestion.services import bbox_q, level_means, within_radius
 
 logger = logging.getLogger(__name__)
 
+# Flags of the ARGO reference table 2 (0 = no QC performed ... 9 = missing value)
+ARGO_QC_FLAGS = tuple("0123456789")
+
+
+def _optional_float(data, key):
+    value = data.get(key)
+    return float(value) if value not in (None, "") else None
+
+
+def _parse_date(value, key):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise LookupParamError(f"Invalid {key} format, expected YYYY-MM-DD")
+
+
+class LookupParamError(ValueError):
+    """A lookup parameter is missing or malformed (reported as HTTP 400)."""
+
+
+def parse_lookup_params(data):
+    """Parses and validates the lookup filters from a GET/POST dict."""
+    try:
+        params = {
+            "min_lat": float(data.get("min_lat", -90)),
+            "max_lat": float(data.get("max_lat", 90)),
+            "min_lon": _optional_float(data, "min_lon"),
+            "max_lon": _optional_float(data, "max_lon"),
+        }
+        radius = tuple(_optional_float(data, key) for key in ("center_lat", "center_lon", "radius_km"))
+    except ValueError:
+        raise LookupParamError("Invalid coordinate or radius, expected a number")
+    if any(v is not None for v in radius) and any(v is None for v in radius):
+        raise LookupParamError("center_lat, center_lon and radius_km must be given together")
+    params["radius"] = radius if radius[2] is not None else None
+
+    # Level filters: only levels inside the pressure range (and with accepted QC flags) are averaged
+    try:
+        params["min_pres"] = _optional_float(data, "min_pres")
+        params["max_pres"] = _optional_float(data, "max_pres")
+    except ValueError:
+        raise LookupParamError("Invalid min_pres or max_pres, expected a number")
+    params["qc"] = parse_qc_flags(data.get("qc"))
+
+    params["ocean_name"] = data.get("ocean_name") or None
+    params["institution"] = data.get("institution") or None
+    params["start_date"] = _parse_date(data["start_date"], "start_date") if data.get("start_date") else None
+    params["end_date"] = _parse_date(data["end_date"], "end_date") if data.get("end_date") else None
+    params["year"] = None
+    if data.get("year"):
+        try:
+            params["year"] = int(data["year"])
+        except ValueError:
+            raise LookupParamError("Invalid year format, expected YYYY")
+
+    # Paging: keyset cursor after (platform_number, cycle_number), or one streamed response
+    max_page_size = getattr(settings, "ARGO_LOOKUP_MAX_PAGE_SIZE", 10000)
+    try:
+        params["limit"] = int(data.get("limit") or getattr(settings, "ARGO_LOOKUP_PAGE_SIZE", 1000))
+    except ValueError:
+        raise LookupParamError("Invalid limit, expected an integer")
+    if not 1 <= params["limit"] <= max_page_size:
+        raise LookupParamError(f"limit must be between 1 and {max_page_size}")
+    params["cursor"] = decode_cursor(data["cursor"]) if data.get("cursor") else None
+    params["stream"] = str(data.get("stream", "")).lower() in ("1", "true", "yes")
+    return params
+
+
+def parse_qc_flags(value):
+    """Accepted QC flags from "1,2" (or a list in a JSON body); None accepts every flag."""
+    if value in (None, "", []):
+        return None
+    flags = value.split(",") if isinstance(value, str) else value
+    flags = tuple(sorted({str(flag).strip() for flag in flags if str(flag).strip()}))
+    if not flags or any(flag not in ARGO_QC_FLAGS for flag in flags):
+        raise LookupParamError(f"Invalid qc, expected a comma separated list of ARGO QC flags ({','.join(ARGO_QC_FLAGS)})")
+    return flags
+
+
+def encode_cursor(row):
+    """Opaque next-page token for the last row of a page."""
+    key = json.dumps([row["platform_number"], row["cycle_number"]])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        platform_number, cycle_number = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return str(platform_number), int(cycle_number)
+    except (ValueError, TypeError):
+        raise LookupParamError("Invalid cursor")
+
+
+def _after_cursor(cursor):
+    """Rows after the cursor in (platform_number, cycle_number) order."""
+    platform_number, cycle_number = cursor
+    # The redundant >= bound lets the (platform_number, cycle_number) index seek to the cursor
+    return Q(platform_number__gte=platform_number) & (
+        Q(platform_number__gt=platform_number) | Q(platform_number=platform_number, cycle_number__gt=cycle_number)
+    )
+
+
+def filter_profiles(params):
+    """
+    The ArgoProfileData queryset matching parsed lookup params. Every filter is written so
+    it can use an index (see the query-plan tests in sql_query/tests.py): year becomes a
+    juld_date range and ocean_name is compared through LOWER(), which the
+    (LOWER(ocean_name), juld_date) expression index serves.
+    """
+    # The default -90..90 latitude bounds match every row; leaving them out lets the planner
+    # pick the index of the filters that actually narrow the query
+    min_lat = params["min_lat"] if params["min_lat"] > -90 else None
+    max_lat = params["max_lat"] if params["max_lat"] < 90 else None
+    profiles = ArgoProfileData.objects.filter(bbox_q(min_lat, max_lat, params["min_lon"], params["max_lon"]))
+    if params["radius"] is not None:
+        profiles = within_radius(profiles, *params["radius"])
+
+    if params["start_date"]:
+        profiles = profiles.filter(juld_date__gte=params["start_date"])
+    if params["end_date"]:
+        profiles = profiles.filter(juld_date__lte=params["end_date"])
+    if params["ocean_name"]:
+        profiles = profiles.alias(ocean_key=Lower("ocean_name")).filter(ocean_key=params["ocean_name"].lower())
+    if params["institution"]:
+        profiles = profiles.filter(institution__iexact=params["institution"])
+    if params["year"]:
+        year_start = datetime(params["year"], 1, 1, tzinfo=timezone.utc)
+        profiles = profiles.filter(juld_date__gte=year_start, juld_date__lt=year_start.replace(year=params["year"] + 1))
+    return profiles
+
+
+LOOKUP_FIELDS = ["platform_number", "cycle_number", "juld_date", "latitude", "longitude", "ocean_name"]
+
+
+def has_level_filters(params):
+    return params["min_pres"] is not None or params["max_pres"] is not None or params["qc"] is not None
+
+
+def lookup_rows(params):
+    """
+    Per-profile rows of the lookup endpoint after the params' cursor, ordered by
+    (platform_number, cycle_number). Without level filters they come from the precomputed
+    ArgoProfileSummary; with min_pres/max_pres/qc the means are aggregated over the
+    matching levels (see level_rows()).
+    """
+    profiles = filter_profiles(params)
+    if params["cursor"]:
+        profiles = profiles.filter(_after_cursor(params["cursor"]))
+    profiles = profiles.order_by("platform_number", "cycle_number")
+    if has_level_filters(params):
+        return level_rows(profiles, params)
+
+    # Per-profile statistics are precomputed at ingestion (ArgoProfileSummary),
+    # so this is a range query on the profile table joined one-to-one
+    return profiles.filter(summary__isnull=False).values(
+        *LOOKUP_FIELDS,
+        avg_temp=F("summary__temperature_mean"),
+        avg_sal=F("summary__salinity_mean"),
+        avg_pres=F("summary__pressure_mean"),
+    )
+
+
+def level_rows(profiles, params):
+    """
+    Means over the levels inside [min_pres, max_pres] with pres_qc in the accepted flags;
+    temperature and salinity also need their own flag accepted. Profiles without a
+    matching level are left out.
+
+    With row storage each mean is a correlated aggregate over ArgoMeasurement, answered
+    from the covering (profile, pressure, QC flags, values) index without reading other
+    levels or the table. Packed levels are filtered in NumPy, a chunk of profiles at a time.
+    """
+    min_pres, max_pres, qc = params["min_pres"], params["max_pres"], params["qc"]
+    if getattr(settings, "ARGO_LEVEL_STORAGE", "rows") == "packed":
+        return _packed_level_rows(profiles.values("pk", *LOOKUP_FIELDS), min_pres, max_pres, qc)
+
+    levels = ArgoMeasurement.objects.filter(profile=OuterRef("pk"))
+    if min_pres is not None:
+        levels = levels.filter(pressure__gte=min_pres)
+    if max_pres is not None:
+        levels = levels.filter(pressure__lte=max_pres)
+    if qc is not None:
+        levels = levels.filter(pres_qc__in=qc)
+
+    def level_mean(field, qc_field=None):
+        matching = levels.filter(**{f"{qc_field}__in": qc}) if qc and qc_field else levels
+        return Subquery(matching.order_by().values("profile").annotate(mean=Avg(field)).values("mean"))
+
+    # One correlated aggregate per returned profile: a page costs `limit` index seeks
+    # instead of a GROUP BY over every matching level
+    return profiles.filter(Exists(levels)).values(
+        *LOOKUP_FIELDS,
+        avg_temp=level_mean("temperature", "temp_qc"),
+        avg_sal=level_mean("salinity", "psal_qc"),
+        avg_pres=level_mean("pressure"),
+    )
+
+
+def _packed_level_rows(headers, min_pres, max_pres, qc, chunk_size=1000):
+    headers = headers.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(headers, chunk_size))
+        if not chunk:
+            return
+        means = level_means([h["pk"] for h in chunk], min_pres, max_pres, qc)
+        for h in chunk:
+            if h["pk"] in means:
+                avg_temp, avg_sal, avg_pres = means[h["pk"]]
+                yield {**h, "avg_temp": avg_temp, "avg_sal": avg_sal, "avg_pres": avg_pres}
+
+
+# Time buckets of the grid endpoint: annotation over juld_date and the label of a bucket value
+GRID_PERIODS = {
+    "none": (None, None),
+    "year": (TruncYear, lambda value: value.strftime("%Y")),
+    "month": (TruncMonth, lambda value: value.strftime("%Y-%m")),
+    "month_of_year": (ExtractMonth, lambda value: value),
+}
+
+
+def parse_grid_params(data):
+    """Parses the grid endpoint's cell size and time bucket (the pressure range is a lookup param)."""
+    try:
+        resolution = float(data.get("resolution") or getattr(settings, "ARGO_GRID_DEFAULT_RESOLUTION", 5.0))
+    except ValueError:
+        raise LookupParamError("Invalid resolution, expected a number")
+    min_resolution = getattr(settings, "ARGO_GRID_MIN_RESOLUTION", 0.25)
+    if not min_resolution <= resolution <= 90:
+        raise LookupParamError(f"resolution must be between {min_resolution} and 90 degrees")
+    period = data.get("period") or "none"
+    if period not in GRID_PERIODS:
+        raise LookupParamError(f"period must be one of {', '.join(GRID_PERIODS)}")
+    return {"resolution": resolution, "period": period}
+
+
+def grid_cells_query(params, grid):
+    """
+    Per-cell aggregates as one GROUP BY query. Without a pressure range the samples are the
+    profiles' mean temperature/salinity (ArgoProfileSummary); with one they are the profiles'
+    standard-level values inside the range (ArgoStandardLevel), so every profile is sampled at
+    the same depths. Variance comes from AVG(x*x) - AVG(x)^2, which every backend supports.
+    """
+    if params["min_pres"] is None and params["max_pres"] is None:
+        rows = filter_profiles(params).filter(summary__isnull=False)
+        prefix, profile = "", "pk"
+        temperature, salinity = F("summary__temperature_mean"), F("summary__salinity_mean")
+    else:
+        rows = ArgoStandardLevel.objects.filter(profile__in=filter_profiles(params).values("pk"))
+        if params["min_pres"] is not None:
+            rows = rows.filter(pressure__gte=params["min_pres"])
+        if params["max_pres"] is not None:
+            rows = rows.filter(pressure__lte=params["max_pres"])
+        prefix, profile = "profile__", "profile"
+        temperature, salinity = F("temperature"), F("salinity")
+
+    resolution = grid["resolution"]
+    # Latitude 90 / longitude 180 fall in the last row/column instead of one of their own
+    group = {
+        "lat_cell": Least(
+            Floor((F(f"{prefix}latitude") + 90) / resolution), int(180 / resolution - 1e-9), output_field=IntegerField()
+        ),
+        "lon_cell": Least(
+            Floor((F(f"{prefix}longitude") + 180) / resolution), int(360 / resolution - 1e-9), output_field=IntegerField()
+        ),
+    }
+    bucket, _ = GRID_PERIODS[grid["period"]]
+    if bucket:
+        group["period"] = bucket(f"{prefix}juld_date")
+
+    return (
+        rows.exclude(**{f"{prefix}latitude__isnull": True}).exclude(**{f"{prefix}longitude__isnull": True})
+        .annotate(**group)
+        .values(*group)
+        .annotate(
+            n_profiles=Count(profile, distinct=bool(prefix)),
+            n_temperature=Count(temperature),
+            temperature_mean=Avg(temperature),
+            temperature_sq=Avg(temperature * temperature),
+            n_salinity=Count(salinity),
+            salinity_mean=Avg(salinity),
+            salinity_sq=Avg(salinity * salinity),
+        )
+        .order_by(*group)
+    )
+
+
+def _std(mean, mean_sq):
+    if mean is None or mean_sq is None:
+        return None
+    # Rounding can make the variance of near-constant cells slightly negative
+    return round(max(mean_sq - mean * mean, 0.0) ** 0.5, 4)
+
+
+def format_cell(r, grid):
+    resolution = grid["resolution"]
+    cell = {
+        "lat_min": round(int(r["lat_cell"]) * resolution - 90, 6),
+        "lon_min": round(int(r["lon_cell"]) * resolution - 180, 6),
+        "n_profiles": r["n_profiles"],
+        "n_temperature": r["n_temperature"],
+        "temperature_mean": round(r["temperature_mean"], 4) if r["temperature_mean"] is not None else None,
+        "temperature_std": _std(r["temperature_mean"], r["temperature_sq"]),
+        "n_salinity": r["n_salinity"],
+        "salinity_mean": round(r["salinity_mean"], 4) if r["salinity_mean"] is not None else None,
+        "salinity_std": _std(r["salinity_mean"], r["salinity_sq"]),
+    }
+    _, label = GRID_PERIODS[grid["period"]]
+    if label:
+        cell["period"] = label(r["period"]) if r["period"] is not None else None
+    return cell
+
+
+def archive_bounds(params):
+    """The parsed lookup params as read_archive() bounds."""
+    bounds = {
+        key: params[key]
+        for key in ("min_lat", "max_lat", "min_lon", "max_lon", "min_pres", "max_pres", "ocean_name", "start_date", "end_date")
+    }
+    if params["radius"] is not None:
+        bounds["radius"] = params["radius"]
+    if params["year"]:
+        year_start = datetime(params["year"], 1, 1, tzinfo=timezone.utc)
+        year_end = datetime(params["year"], 12, 31, 23, 59, 59, 999999, tzinfo=timezone.utc)
+        bounds["start_date"] = max(bounds["start_date"], year_start) if bounds["start_date"] else year_start
+        bounds["end_date"] = min(bounds["end_date"], year_end) if bounds["end_date"] else year_end
+    return bounds
+
+
+def format_row(r):
+    return {
+        "platform_number": r["platform_number"],
+        "cycle_number": r["cycle_number"],
+        "date": r["juld_date"].strftime("%Y-%m-%d %H:%M:%S")
+        if r["juld_date"] else None,
+        "latitude": r["latitude"],
+        "longitude": r["longitude"],
+        "ocean_name": r["ocean_name"],
+        "temperature_mean": round(r["avg_temp"], 3) if r["avg_temp"] is not None else None,
+        "salinity_mean": round(r["avg_sal"], 3) if r["avg_sal"] is not None else None,
+        "pressure_mean": round(r["avg_pres"], 3) if r["avg_pres"] is not None else None,
+    }
+
+
+def _stream_rows(rows):
+    """Yields the same JSON document as a single page, one row at a time."""
+    yield '{"results": ['
+    count = 0
+    for r in rows:
+        yield ("," if count else "") + json.dumps(format_row(r))
+        count += 1
+    yield f'], "count": {count}, "next_cursor": null}}'
+
 
 @csrf_exempt
 # django/views.py
@@ -17,7 +377,13 @@ logger = logging.getLogger(__name__)
 def sql_query_argo_data(request):
     """
     API endpoint to query floats with filters:
-    min_lat, max_lat, ocean_name, start_date, end_date, institution, year.
+    min_lat, max_lat, min_lon, max_lon (min_lon > max_lon crosses the dateline),
+    center_lat + center_lon + radius_km (km), ocean_name, start_date, end_date, institution, year.
+    min_pres/max_pres (dbar) and qc (accepted QC flags, e.g. "1,2") restrict the levels the
+    means are computed over.
+    source=parquet answers from the exported Parquet archive instead of the database.
+    Results are pages of `limit` rows ordered by (platform_number, cycle_number); pass the
+    returned next_cursor as `cursor` for the next page, or stream=1 to stream every row.
     """
     try:
         if request.method == "POST":
@@ -28,82 +394,175 @@ def sql_query_argo_data(request):
         else:
             data = request.GET.dict()
 
-        min_lat = float(data.get("min_lat", -90))
-        max_lat = float(data.get("max_lat", 90))
-        ocean_name = data.get("ocean_name") or None
-        start_date = data.get("start_date") or None
-        end_date = data.get("end_date") or None
-        institution = data.get("institution") or None
-        year = data.get("year") or None
-
-        profiles = ArgoProfileData.objects.filter(
-            latitude__gte=min_lat,
-            latitude__lte=max_lat,
-        )
+        try:
+            params = parse_lookup_params(data)
+        except LookupParamError as e:
+            return JsonResponse({"error": str(e)}, status=400)
 
-        if start_date:
+        source = "parquet" if data.get("source") == "parquet" else "db"
+        cache_key = None
+        if not params["stream"] and lookup_cache.enabled:
+            generation = DataGeneration.current()
+            # Parquet answers change when the archive is re-exported, not when the DB changes
+            version = read_export_state().get("exported_at") if source == "parquet" else None
+            cache_key = lookup_cache.key(params, generation, [source, version])
+            payload = lookup_cache.get(cache_key, generation)
+            if payload is not None:
+                response = JsonResponse(payload, status=200)
+                response["X-Lookup-Cache"] = "hit"
+                return response
+
+        if source == "parquet":
+            if params["institution"]:
+                return JsonResponse({"error": "institution is not available with source=parquet"}, status=400)
             try:
-                start_date = datetime.strptime(start_date, "%Y-%m-%d")
-                profiles = profiles.filter(juld_date__gte=start_date)
-            except ValueError:
-                return JsonResponse({"error": "Invalid start_date format, expected YYYY-MM-DD"}, status=400)
+                results = profile_means(qc=params["qc"], **archive_bounds(params))
+            except ArchiveUnavailable as e:
+                return JsonResponse({"error": str(e)}, status=503)
+            if params["cursor"]:
+                results = [r for r in results if (r["platform_number"], r["cycle_number"]) > params["cursor"]]
+        else:
+            results = lookup_rows(params)
+
+        if params["stream"]:
+            if isinstance(results, QuerySet):
+                # Server-side chunked fetch instead of loading the whole result set
+                results = results.iterator(chunk_size=2000)
+            return StreamingHttpResponse(_stream_rows(results), content_type="application/json")
+
+        # One row past the page tells whether another page exists
+        if isinstance(results, QuerySet):
+            page = list(results[:params["limit"] + 1])
+        else:
+            page = list(islice(results, params["limit"] + 1))
+        next_cursor = encode_cursor(page[params["limit"] - 1]) if len(page) > params["limit"] else None
+        formatted = [format_row(r) for r in page[:params["limit"]]]
+
+        payload = {"count": len(formatted), "next_cursor": next_cursor, "results": formatted}
+        if cache_key:
+            lookup_cache.put(cache_key, payload)
+        response = JsonResponse(payload, status=200)
+        response["X-Lookup-Cache"] = "miss" if cache_key else "off"
+        return response
+
+    except Exception as e:
+        logger.exception("Error while querying ARGO data")
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def lookup_cache_stats(request):
+    """Hit/miss counters of this process' lookup cache and the current data generation."""
+    return JsonResponse({**lookup_cache.stats(), "data_generation": DataGeneration.current()})
+
+
+def parse_profile_keys(data):
+    """
+    (platform_number, cycle_number) keys of a levels request: `profiles` as
+    "PLATFORM:CYCLE,PLATFORM:CYCLE" (GET) or a list of [platform, cycle] pairs (POST JSON).
+    """
+    profiles = data.get("profiles") or []
+    if isinstance(profiles, str):
+        profiles = [item.split(":", 1) for item in profiles.split(",") if item.strip()]
+    try:
+        keys = list(dict.fromkeys((str(platform).strip(), int(cycle)) for platform, cycle in profiles))
+    except (ValueError, TypeError):
+        raise LookupParamError("Invalid profiles, expected PLATFORM:CYCLE pairs")
+    if not keys:
+        raise LookupParamError("profiles is required")
+
+    max_profiles = getattr(settings, "ARGO_LEVELS_MAX_PROFILES", 1000)
+    if len(keys) > max_profiles:
+        raise LookupParamError(f"At most {max_profiles} profiles per request")
+    return keys
 
-        if end_date:
+
+@csrf_exempt
+def profile_levels(request):
+    """
+    API endpoint returning the level vectors (pressure, temperature, salinity, their adjusted
+    values and QC flags) of many profiles in one request:
+    profiles (PLATFORM:CYCLE list), fields (comma separated subset of the level fields),
+    format=npz (NumPy archive), arrow (Arrow IPC stream, one row per profile with list
+    columns) or json (default).
+    """
+    try:
+        if request.method == "POST":
             try:
-                end_date = datetime.strptime(end_date, "%Y-%m-%d")
-                profiles = profiles.filter(juld_date__lte=end_date)
-            except ValueError:
-                return JsonResponse({"error": "Invalid end_date format, expected YYYY-MM-DD"}, status=400)
+                data = json.loads(request.body)
+            except json.JSONDecodeError:
+                return JsonResponse({"error": "Invalid JSON body"}, status=400)
+        else:
+            data = request.GET.dict()
+
+        output = data.get("format") or "json"
+        if output not in ENCODERS:
+            return JsonResponse({"error": f"format must be one of {', '.join(ENCODERS)}"}, status=400)
+        fields = data.get("fields") or LEVEL_FIELDS
+        if isinstance(fields, str):
+            fields = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in fields if f not in LEVEL_FIELDS]
+        if unknown:
+            return JsonResponse({"error": f"Unknown fields: {', '.join(unknown)}"}, status=400)
+        try:
+            keys = parse_profile_keys(data)
+        except LookupParamError as e:
+            return JsonResponse({"error": str(e)}, status=400)
 
-        if ocean_name:
-            profiles = profiles.filter(ocean_name__iexact=ocean_name)
+        encoder, content_type = ENCODERS[output]
+        try:
+            body = encoder(*fetch_profile_levels(keys, fields))
+        except ImportError:
+            return JsonResponse({"error": "format=arrow requires pyarrow (pip install pyarrow)"}, status=503)
+        return HttpResponse(body, content_type=content_type)
+
+    except Exception as e:
+        logger.exception("Error while reading ARGO profile levels")
+        return JsonResponse({"error": str(e)}, status=500)
 
-        if institution:
-            profiles = profiles.filter(institution__iexact=institution)
 
-        if year:
+@csrf_exempt
+def grid_aggregate(request):
+    """
+    API endpoint binning profiles into resolution-degree lat/lon cells and, with period=year,
+    month or month_of_year, into time buckets. Takes the lookup endpoint's filters; with
+    min_pres/max_pres it averages standard-level values over the pressure range instead of
+    the whole-profile means (qc does not apply: standard levels already skip bad levels).
+    Each cell reports counts and temperature/salinity mean and population std; empty cells
+    are left out.
+    """
+    try:
+        if request.method == "POST":
             try:
-                year = int(year)
-                profiles = profiles.filter(juld_date__year=year)
-            except ValueError:
-                return JsonResponse({"error": "Invalid year format, expected YYYY"}, status=400)
-
-        results = (
-            ArgoMeasurement.objects.filter(profile__in=profiles)
-            .values(
-                "profile__platform_number",
-                "profile__cycle_number",
-                "profile__juld_date",
-                "profile__latitude",
-                "profile__longitude",
-                "profile__ocean_name",
-            )
-            .annotate(
-                avg_temp=Avg("temperature"),
-                avg_sal=Avg("salinity"),
-                avg_pres=Avg("pressure"),
-            )
-            .order_by("profile__platform_number", "profile__cycle_number")
-        )
+                data = json.loads(request.body)
+            except json.JSONDecodeError:
+                return JsonResponse({"error": "Invalid JSON body"}, status=400)
+        else:
+            data = request.GET.dict()
 
-        formatted = [
-            {
-                "platform_number": r["profile__platform_number"],
-                "cycle_number": r["profile__cycle_number"],
-                "date": r["profile__juld_date"].strftime("%Y-%m-%d %H:%M:%S")
-                if r["profile__juld_date"] else None,
-                "latitude": r["profile__latitude"],
-                "longitude": r["profile__longitude"],
-                "ocean_name": r["profile__ocean_name"],
-                "temperature_mean": round(r["avg_temp"], 3) if r["avg_temp"] is not None else None,
-                "salinity_mean": round(r["avg_sal"], 3) if r["avg_sal"] is not None else None,
-                "pressure_mean": round(r["avg_pres"], 3) if r["avg_pres"] is not None else None,
-            }
-            for r in results
-        ]
-
-        return JsonResponse({"count": len(formatted), "results": formatted}, status=200)
+        try:
+            params = parse_lookup_params(data)
+            grid = parse_grid_params(data)
+        except LookupParamError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        cache_key = None
+        if lookup_cache.enabled:
+            generation = DataGeneration.current()
+            cache_key = lookup_cache.key({**params, **grid}, generation, ["grid"])
+            payload = lookup_cache.get(cache_key, generation)
+            if payload is not None:
+                response = JsonResponse(payload, status=200)
+                response["X-Lookup-Cache"] = "hit"
+                return response
+
+        cells = [format_cell(r, grid) for r in grid_cells_query(params, grid)]
+        payload = {**grid, "min_pres": params["min_pres"], "max_pres": params["max_pres"], "count": len(cells), "cells": cells}
+        if cache_key:
+            lookup_cache.put(cache_key, payload)
+        response = JsonResponse(payload, status=200)
+        response["X-Lookup-Cache"] = "miss" if cache_key else "off"
+        return response
 
     except Exception as e:
-        logger.exception("Error while querying ARGO data")
+        logger.exception("Error while aggregating ARGO data")
         return JsonResponse({"error": str(e)}, status=500)